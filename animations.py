@@ -3,10 +3,18 @@ from settings import *
 
 
 class Animation:
-    """Базовый класс для анимаций"""
+    """Базовый класс для анимаций
 
-    def __init__(self, images, speed=0.1, loop=True):
-        self.images = images
+    Кадры общие для всех экземпляров (см. AnimationBank),
+    сама анимация хранит только позицию воспроизведения.
+    mirrored - заранее отраженные по горизонтали кадры (если нужны).
+    """
+
+    __slots__ = ("images", "mirrored", "speed", "loop", "frame", "done")
+
+    def __init__(self, images, speed=0.1, loop=True, mirrored=None):
+        self.images = tuple(images)
+        self.mirrored = tuple(mirrored) if mirrored is not None else None
         self.speed = speed
         self.loop = loop
         self.frame = 0
@@ -22,7 +30,12 @@ class Animation:
                     self.frame = len(self.images) - 1
                     self.done = True
 
-    def get_current_image(self):
+    def get_current_index(self):
+        return int(self.frame) % len(self.images)
+
+    def get_current_image(self, flipped=False):
+        if flipped and self.mirrored is not None:
+            return self.mirrored[int(self.frame) % len(self.mirrored)]
         return self.images[int(self.frame) % len(self.images)]
 
     def reset(self):
@@ -65,10 +78,77 @@ class SpriteSheet:
                         self.frame_height))
 
 
+class AnimationBank:
+    """Общий для всего процесса склад кадров анимаций
+
+    Каждый набор кадров строится (или загружается с диска) один раз
+    при первом обращении и дальше только переиспользуется.
+    Набор - словарь: имя анимации -> (кадры, скорость, зацикленность).
+    """
+
+    def __init__(self):
+        self.builders = {}
+        self.frame_sets = {}
+        self.mirrored_sets = {}
+
+    def register(self, name, builder):
+        """Регистрация функции, создающей набор кадров"""
+        self.builders[name] = builder
+        self.frame_sets.pop(name, None)
+        self.mirrored_sets.pop(name, None)
+
+    def register_sheet(self, name, filename, frame_width, frame_height, rows):
+        """Регистрация набора кадров из спрайт-листа
+
+        rows - словарь: имя анимации -> (строка, скорость, зацикленность)
+        """
+        def build():
+            sheet = SpriteSheet(filename, frame_width, frame_height)
+            return {anim_name: (sheet.get_frames(row), speed, loop)
+                    for anim_name, (row, speed, loop) in rows.items()}
+
+        self.register(name, build)
+
+    def get(self, name):
+        """Набор кадров по имени (строится при первом обращении)"""
+        frame_set = self.frame_sets.get(name)
+        if frame_set is None:
+            frame_set = {anim_name: (tuple(frames), speed, loop)
+                         for anim_name, (frames, speed, loop) in self.builders[name]().items()}
+            self.frame_sets[name] = frame_set
+        return frame_set
+
+    def get_mirrored(self, name):
+        """Отраженные по горизонтали кадры набора (строятся один раз)"""
+        mirrored_set = self.mirrored_sets.get(name)
+        if mirrored_set is None:
+            mirrored_set = {anim_name: mirror_frames(frames)
+                            for anim_name, (frames, speed, loop) in self.get(name).items()}
+            self.mirrored_sets[name] = mirrored_set
+        return mirrored_set
+
+    def create(self, name, mirrored=False):
+        """Новые курсоры воспроизведения поверх общих кадров"""
+        mirrored_set = self.get_mirrored(name) if mirrored else {}
+        return {anim_name: Animation(frames, speed=speed, loop=loop,
+                                     mirrored=mirrored_set.get(anim_name))
+                for anim_name, (frames, speed, loop) in self.get(name).items()}
+
+    def clear(self):
+        """Сброс построенных кадров"""
+        self.frame_sets.clear()
+        self.mirrored_sets.clear()
+
+
+def mirror_frames(frames):
+    """Отражение кадров по горизонтали"""
+    return tuple(pygame.transform.flip(frame, True, False) for frame in frames)
+
+
 # Создаем простые анимации через код (если нет спрайт-листов)
-def create_player_animations():
-    """Создание анимаций игрока через код"""
-    animations = {}
+def build_player_frames():
+    """Кадры анимаций игрока через код"""
+    frame_set = {}
 
     # Анимация покоя
     idle_frames = []
@@ -87,7 +167,7 @@ def create_player_animations():
         pygame.draw.arc(surf, WHITE, (10, 25, 20, 15), 0, 3.14, 2)
         idle_frames.append(surf)
 
-    animations["idle"] = Animation(idle_frames, speed=0.1)
+    frame_set["idle"] = (idle_frames, 0.1, True)
 
     # Анимация бега
     run_frames = []
@@ -112,7 +192,7 @@ def create_player_animations():
         pygame.draw.arc(surf, WHITE, (10, 25, 20, 15), 0, 3.14, 2)
         run_frames.append(surf)
 
-    animations["run"] = Animation(run_frames, speed=0.2)
+    frame_set["run"] = (run_frames, 0.2, True)
 
     # Анимация прыжка
     jump_frames = []
@@ -134,14 +214,14 @@ def create_player_animations():
         pygame.draw.ellipse(surf, WHITE, (12, 30, 16, 8))
         jump_frames.append(surf)
 
-    animations["jump"] = Animation(jump_frames, speed=0.15, loop=False)
+    frame_set["jump"] = (jump_frames, 0.15, False)
 
-    return animations
+    return frame_set
 
 
-def create_coin_animations():
-    """Анимации монеток"""
-    animations = {}
+def build_coin_frames():
+    """Кадры анимаций монеток"""
+    frame_set = {}
 
     # Вращение монетки
     spin_frames = []
@@ -163,7 +243,7 @@ def create_coin_animations():
 
         spin_frames.append(surf)
 
-    animations["spin"] = Animation(spin_frames, speed=0.3)
+    frame_set["spin"] = (spin_frames, 0.3, True)
 
     # Мерцание
     glow_frames = []
@@ -176,6 +256,22 @@ def create_coin_animations():
         pygame.draw.circle(surf, (255, 255, 200), (12, 12), 5)
         glow_frames.append(surf)
 
-    animations["glow"] = Animation(glow_frames, speed=0.2)
+    frame_set["glow"] = (glow_frames, 0.2, True)
+
+    return frame_set
 
-    return animations
\ No newline at end of file
+
+# Глобальный склад кадров
+animation_bank = AnimationBank()
+animation_bank.register("player", build_player_frames)
+animation_bank.register("coin", build_coin_frames)
+
+
+def create_player_animations():
+    """Анимации игрока (кадры общие для всех игроков)"""
+    return animation_bank.create("player", mirrored=True)
+
+
+def create_coin_animations():
+    """Анимации монеток (кадры общие для всех монеток)"""
+    return animation_bank.create("coin")
\ No newline at end of file
@@ -1,9 +1,29 @@
 """
 audio.py - Управление звуками игры
 """
-import pygame
-import math
-import random
+import threading
+
+import numpy as np
+
+import synth
+from audio_cache import audio_cache
+from settings_store import settings_store
+from tracing import tracer
+
+# Звуковые эффекты: имя -> (частота, длительность)
+SOUND_EFFECTS = {
+    "jump": (600, 0.1),          # Прыжок - короткий высокий звук
+    "coin": (800, 0.08),         # Монетка - звонкий звук
+    "enemy_death": (300, 0.2),   # Смерть врага - низкий звук
+    "hurt": (200, 0.3),          # Урон - неприятный звук
+    "win": (1000, 0.5),          # Победа - радостный звук
+}
+
+# Длина петли фоновой музыки (секунды)
+MUSIC_DURATION = 10.0
+
+# Зерно шума ударных (музыка одинакова при каждом запуске и кэшируется)
+MUSIC_SEED = 1
 
 
 class AudioManager:
@@ -14,104 +34,128 @@ class AudioManager:
         self.music_playing = False
         self.volume = 0.7
 
-    def initialize(self):
-        """Создание звуков"""
-        try:
-            self.create_simple_sounds()
-            print("Звуки созданы успешно")
-        except Exception as e:
-            print(f"Ошибка создания звуков: {e}")
-            self.sounds = {}
+        # Петля музыки создается один раз и живет в памяти
+        self.music_sound = None
+
+        # Фоновая подготовка звуков (start_warmup)
+        self.warmup_thread = None
+        self.music_lock = threading.Lock()
+
+    def start_warmup(self):
+        """Подготовка звуков и музыки в фоновом потоке, чтобы не задерживать первый кадр"""
+        if self.warmup_thread is not None:
+            return
+        self.volume = max(0.0, min(1.0, settings_store.volume))
+        self.warmup_thread = threading.Thread(target=self.warmup, name="audio-warmup", daemon=True)
+        self.warmup_thread.start()
+
+    def warming_up(self):
+        """Идет ли еще фоновая подготовка"""
+        return self.warmup_thread is not None and self.warmup_thread.is_alive()
+
+    def warmup(self):
+        """Фоновый поток: эффекты по одному, затем музыка"""
+        tracer.name_thread("audio-warmup")
+        with tracer.span("audio_warmup", "audio"):
+            try:
+                self.create_simple_sounds()
+                print("Звуки созданы успешно")
+            except Exception as e:
+                print(f"Ошибка создания звуков: {e}")
+
+            try:
+                music_sound = self.load_music()
+            except Exception as e:
+                print(f"Не удалось подготовить музыку: {e}")
+                music_sound = None
+
+            # Если музыку уже запросили, она начинается, как только готов буфер
+            with self.music_lock:
+                self.music_sound = music_sound
+                if self.music_playing:
+                    if music_sound is not None:
+                        music_sound.play(loops=-1)
+                    else:
+                        self.music_playing = False
 
     def create_simple_sounds(self):
         """Создание простых звуков"""
-        # Прыжок - короткий высокий звук
-        self.sounds["jump"] = self.create_sound(600, 0.1)
-
-        # Монетка - звонкий звук
-        self.sounds["coin"] = self.create_sound(800, 0.08)
-
-        # Смерть врага - низкий звук
-        self.sounds["enemy_death"] = self.create_sound(300, 0.2)
-
-        # Урон - неприятный звук
-        self.sounds["hurt"] = self.create_sound(200, 0.3)
-
-        # Победа - радостный звук
-        self.sounds["win"] = self.create_sound(1000, 0.5)
+        for name, (frequency, duration) in SOUND_EFFECTS.items():
+            self.sounds[name] = self.create_sound(frequency, duration)
 
+    @tracer.traced("create_sound", "audio")
     def create_sound(self, frequency, duration):
-        """Создание простого звука"""
-        sample_rate = 22050
-        n_samples = int(round(duration * sample_rate))
-
-        buf = bytearray(n_samples * 2)
-
-        for i in range(n_samples):
-            t = float(i) / sample_rate
-            # Плавное затухание
-            envelope = 1.0 - (t / duration)
-            sine = int(32767.0 * 0.3 * envelope * math.sin(2.0 * math.pi * frequency * t))
-
-            buf[2 * i] = sine & 0xff
-            buf[2 * i + 1] = (sine >> 8) & 0xff
-
-        sound = pygame.mixer.Sound(buffer=bytes(buf))
-        sound.set_volume(self.volume)
-        return sound
-
+        """Создание простого звука (из дискового кэша, если он там есть)"""
+        return audio_cache.sound("effect", {"frequency": frequency, "duration": duration},
+                                 lambda: self.render_sound(frequency, duration),
+                                 self.volume)
+
+    def render_sound(self, frequency, duration):
+        """Синтез простого звука"""
+        rate = synth.sample_rate()
+        samples = synth.tone(frequency, duration, rate, amplitude=0.3)
+        # Плавное затухание
+        samples *= synth.fade_out(len(samples))
+        return samples
+
+    def render_music(self):
+        """Простая мелодия: синусоида, басс октавой ниже и ритм"""
+        rate = synth.sample_rate()
+        duration = MUSIC_DURATION
+
+        # Основная мелодия и басс
+        freq = 440.0  # Ля первой октавы
+        melody = synth.tone(freq, duration, rate, amplitude=0.1)
+        bass = synth.tone(freq * 0.5, duration, rate, amplitude=0.05)
+
+        # Ритм: шумовой удар в начале каждой секунды, длится 0.5 секунды
+        rng = np.random.default_rng(MUSIC_SEED)
+        hits = [(float(second),) for second in range(int(duration))]
+        drums = synth.sequence(hits, duration, rate,
+                               lambda: synth.drum(0.5, rate, rng, amplitude=0.05))
+
+        return synth.mix(melody, bass, drums)
+
+    def load_music(self):
+        """Петля музыки из кэша или синтезом"""
+        return audio_cache.sound(
+            "music", {"duration": MUSIC_DURATION, "seed": MUSIC_SEED},
+            self.render_music, self.volume * 0.3)
+
+    @tracer.traced("play_music", "audio")
     def play_music(self):
         """Запуск простой фоновой музыки"""
-        if not self.music_playing:
-            try:
-                # Создаем простую музыку прямо в памяти
-                sample_rate = 22050
-                duration = 10.0  # 10 секунд петли
-                n_samples = int(round(duration * sample_rate))
-
-                buf = bytearray(n_samples * 2)
+        with self.music_lock:
+            if self.music_playing:
+                return
+            self.music_playing = True
 
-                # Простая мелодия
-                for i in range(n_samples):
-                    t = float(i) / sample_rate
+            # Буфер еще готовится - музыку запустит фоновый поток
+            if self.music_sound is None and self.warming_up():
+                return
 
-                    # Основная мелодия (синусоида)
-                    freq = 440.0  # Ля первой октавы
-                    wave1 = 0.1 * math.sin(2.0 * math.pi * freq * t)
-
-                    # Басс (октавой ниже)
-                    wave2 = 0.05 * math.sin(2.0 * math.pi * freq * 0.5 * t)
-
-                    # Ритм
-                    drum = 0
-                    if int(t * 2) % 2 == 0:  # Каждые 0.5 секунды
-                        drum = 0.05 * random.random() * math.exp(-(t % 0.5) * 10)
-
-                    mixed = wave1 + wave2 + drum
-                    sample = int(32767.0 * mixed)
-                    sample = max(-32768, min(32767, sample))
-
-                    buf[2 * i] = sample & 0xff
-                    buf[2 * i + 1] = (sample >> 8) & 0xff
-
-                # Создаем звук из буфера
-                music_sound = pygame.mixer.Sound(buffer=bytes(buf))
-                music_sound.set_volume(self.volume * 0.3)
+            try:
+                # Музыка синтезируется (или читается из кэша) только один раз
+                if self.music_sound is None:
+                    self.music_sound = self.load_music()
 
                 # Воспроизводим в цикле
-                music_sound.play(loops=-1)
-                self.music_playing = True
+                self.music_sound.play(loops=-1)
 
             except Exception as e:
                 print(f"Не удалось воспроизвести музыку: {e}")
+                self.music_playing = False
 
     def stop_music(self):
         """Остановка музыки"""
-        pygame.mixer.music.stop()
-        self.music_playing = False
+        with self.music_lock:
+            # Музыка играет как Sound, а не через pygame.mixer.music
+            if self.music_sound is not None:
+                self.music_sound.stop()
+            self.music_playing = False
 
     def play_sound(self, name):
-        """Воспроизведение звука"""
+        """Воспроизведение звука (еще не готовые звуки пропускаются)"""
         if name in self.sounds:
             try:
                 self.sounds[name].play()
@@ -121,10 +165,13 @@ class AudioManager:
     def set_volume(self, volume):
         """Установка громкости"""
         self.volume = max(0.0, min(1.0, volume))
+        settings_store.set("volume", self.volume)
 
-        # Обновляем громкость всех звуков
-        for sound in self.sounds.values():
+        # Обновляем громкость всех звуков (словарь может пополняться из фонового потока)
+        for sound in list(self.sounds.values()):
             sound.set_volume(self.volume)
+        if self.music_sound is not None:
+            self.music_sound.set_volume(self.volume * 0.3)
 
 
 # Глобальный экземпляр
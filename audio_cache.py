@@ -0,0 +1,109 @@
+"""
+audio_cache.py - Кэш синтезированного звука на диске
+
+Готовый PCM хранится в файле, имя которого - хеш параметров синтеза,
+формата микшера и версии синтезатора (synth.SYNTH_VERSION). При
+повторном запуске файл отображается в память (mmap) и отдается
+pygame.mixer.Sound без синтеза и без копирования в Python.
+"""
+import hashlib
+import json
+import mmap
+import os
+
+import pygame
+
+import synth
+from tracing import tracer
+
+AUDIO_CACHE_DIR = ".audio_cache"
+
+
+class AudioCache:
+    """Кэш PCM по ключу из параметров синтеза"""
+
+    def __init__(self, directory=AUDIO_CACHE_DIR):
+        self.directory = directory
+
+        # Статистика
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, kind, params, fmt):
+        """Ключ: хеш вида звука, параметров, формата микшера и версии синтеза"""
+        description = json.dumps({
+            "kind": kind,
+            "params": params,
+            "format": list(fmt),
+            "version": synth.SYNTH_VERSION,
+        }, sort_keys=True)
+        return hashlib.sha1(description.encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".pcm")
+
+    @tracer.traced("audio_cache_load", "io")
+    def load(self, key, fmt):
+        """Звук из кэша или None"""
+        frame_size = abs(fmt[1]) // 8 * fmt[2]
+        try:
+            with open(self.path(key), "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0 or size % frame_size:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return pygame.mixer.Sound(buffer=data)
+        except (OSError, ValueError, pygame.error):
+            return None
+
+    @tracer.traced("audio_cache_store", "io")
+    def store(self, key, pcm):
+        """Запись PCM в кэш (через временный файл, чтобы не оставить обрывок)"""
+        path = self.path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, "wb") as f:
+                f.write(memoryview(pcm).cast("B"))
+            os.replace(temp_path, path)
+            return True
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+
+    def sound(self, kind, params, render, volume=1.0):
+        """Звук из кэша; при промахе render() синтезирует сэмплы и они сохраняются"""
+        fmt = synth.mixer_format()
+        key = self.key(kind, params, fmt)
+
+        sound = self.load(key, fmt)
+        if sound is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            pcm = synth.to_pcm(render(), fmt)
+            self.store(key, pcm)
+            sound = pygame.mixer.Sound(buffer=pcm)
+
+        sound.set_volume(volume)
+        return sound
+
+    def clear(self):
+        """Удаление всех файлов кэша"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(".pcm"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+# Глобальный экземпляр
+audio_cache = AudioCache()
@@ -0,0 +1,187 @@
+"""
+backgrounds.py - Фоны уровней с параллаксом
+
+Каждый слой фона рисуется один раз в широкую полосу-петлю,
+а каждый кадр только прокручивается двумя blit'ами.
+"""
+import random
+
+import pygame
+from settings import *
+from levels import BACKGROUNDS, get_background_color
+
+
+def create_cloud_surface(alpha=180):
+    """Облако на поверхности с прозрачностью"""
+    cloud_surface = pygame.Surface((100, 60), pygame.SRCALPHA)
+    pygame.draw.circle(cloud_surface, (255, 255, 255, alpha), (25, 30), 25)
+    pygame.draw.circle(cloud_surface, (255, 255, 255, alpha), (50, 20), 20)
+    pygame.draw.circle(cloud_surface, (255, 255, 255, alpha), (0, 20), 20)
+    return cloud_surface
+
+
+def build_far_clouds(width):
+    """Дальние бледные облака"""
+    surface = pygame.Surface((width, 30), pygame.SRCALPHA)
+    cloud = pygame.transform.smoothscale(create_cloud_surface(alpha=90), (50, 30))
+    rng = random.Random(1)
+    for x in range(0, width - 110, 180):
+        surface.blit(cloud, (x + rng.randint(0, 60), 0))
+    return surface
+
+
+def build_clouds(width):
+    """Облака: три облака с шагом 300"""
+    surface = pygame.Surface((width, 60), pygame.SRCALPHA)
+    cloud = create_cloud_surface()
+    for i in range(3):
+        surface.blit(cloud, (i * 300, 0))
+    return surface
+
+
+def build_hills(width, height, color, peaks, seed):
+    """Силуэт холмов или скал"""
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    rng = random.Random(seed)
+    step = width // peaks
+    points = [(0, height)]
+    for x in range(0, width + 1, step):
+        points.append((x, rng.randint(height // 5, height * 3 // 5)))
+    points.append((width, points[1][1]))
+    points.append((width, height))
+    pygame.draw.polygon(surface, color, points)
+    return surface
+
+
+def build_tree_line(width, height, color, seed):
+    """Ряд елок"""
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    rng = random.Random(seed)
+    x = 0
+    while x < width:
+        tree_height = rng.randint(height // 2, height)
+        tree_width = tree_height // 2
+        pygame.draw.polygon(surface, color, [
+            (x, height),
+            (x + tree_width // 2, height - tree_height),
+            (x + tree_width, height)
+        ])
+        x += tree_width - rng.randint(0, tree_width // 3)
+    return surface
+
+
+def build_embers(width, height, color, count, seed):
+    """Тлеющие искры"""
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    rng = random.Random(seed)
+    for _ in range(count):
+        pos = (rng.randrange(width), rng.randrange(height))
+        pygame.draw.circle(surface, (*color, rng.randint(60, 160)), pos, rng.randint(1, 3))
+    return surface
+
+
+# Слои фонов по имени из levels.BACKGROUNDS (от дальних к ближним):
+# build - функция построения полосы нужной ширины, period - ширина петли,
+# y - высота полосы, offset - начальный сдвиг, ms_per_pixel - скорость
+# прокрутки (0 - слой стоит на месте), parallax - доля тряски экрана
+BACKGROUND_LAYERS = {
+    "sky": [
+        {"build": build_far_clouds, "period": WIDTH + 100, "y": 20,
+         "ms_per_pixel": 120, "parallax": 0.25},
+        {"build": build_clouds, "period": WIDTH + 200, "y": 50, "offset": -150,
+         "ms_per_pixel": 50, "parallax": 0.5},
+    ],
+    "forest": [
+        {"build": lambda width: build_hills(width, 220, (24, 110, 24), 6, 2),
+         "period": WIDTH, "y": HEIGHT - 260, "parallax": 0.25},
+        {"build": lambda width: build_tree_line(width, 160, (20, 90, 20), 3),
+         "period": WIDTH, "y": HEIGHT - 200, "parallax": 0.5},
+    ],
+    "danger": [
+        {"build": lambda width: build_hills(width, 260, (100, 0, 0), 9, 4),
+         "period": WIDTH, "y": HEIGHT - 300, "parallax": 0.25},
+        {"build": lambda width: build_embers(width, 300, (255, 140, 0), 40, 5),
+         "period": WIDTH, "y": 100, "ms_per_pixel": 80, "parallax": 0.5},
+    ],
+}
+
+
+class ParallaxLayer:
+    """Один слой фона - заранее нарисованная полоса-петля"""
+
+    def __init__(self, build, period, y, ms_per_pixel=0, parallax=0.5, offset=0):
+        self.surface = build(period)
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+        self.period = period
+        self.y = y
+        self.ms_per_pixel = ms_per_pixel
+        self.parallax = parallax
+        self.offset = offset
+
+        # Положение полосы в текущем кадре
+        self.x = offset
+        self.draw_y = y
+
+    def update(self, ticks, shake_x=0, shake_y=0):
+        """Сдвиг полосы; возвращает True, если она сдвинулась"""
+        scroll = ticks // self.ms_per_pixel % self.period if self.ms_per_pixel else 0
+        x = scroll + self.offset + int(shake_x * self.parallax)
+        y = self.y + int(shake_y * self.parallax)
+
+        moved = (x, y) != (self.x, self.draw_y)
+        self.x = x
+        self.draw_y = y
+        return moved
+
+    def band(self):
+        """Полоса экрана, которую занимает слой"""
+        return pygame.Rect(0, self.draw_y, WIDTH, self.surface.get_height())
+
+    def draw(self, target):
+        """Две копии полосы покрывают экран при любом сдвиге"""
+        target.blit(self.surface, (self.x - self.period, self.draw_y))
+        target.blit(self.surface, (self.x, self.draw_y))
+        if self.x + self.period < WIDTH:
+            target.blit(self.surface, (self.x + self.period, self.draw_y))
+
+
+class ParallaxBackground:
+    """Фон уровня: заливка цветом и слои с параллаксом"""
+
+    def __init__(self, name):
+        self.name = name
+        self.color = get_background_color(name)
+        self.layers = [ParallaxLayer(**spec) for spec in BACKGROUND_LAYERS.get(name, [])]
+
+    def update(self, ticks, shake_x=0, shake_y=0):
+        """Сдвиг слоев; возвращает полосы экрана, которые изменились"""
+        changed = []
+        for layer in self.layers:
+            old_band = layer.band()
+            if layer.update(ticks, shake_x, shake_y):
+                changed.append(old_band)
+                changed.append(layer.band())
+        return changed
+
+    def draw(self, target):
+        """Отрисовка фона (учитывает область отсечения target)"""
+        target.fill(self.color)
+        for layer in self.layers:
+            layer.draw(target)
+
+
+# Фоны строятся один раз на имя
+backgrounds = {}
+
+
+def get_background(name):
+    """Фон по имени из levels.BACKGROUNDS (слои рисуются при первом обращении)"""
+    if name not in BACKGROUNDS:
+        name = "sky"
+
+    background = backgrounds.get(name)
+    if background is None:
+        background = ParallaxBackground(name)
+        backgrounds[name] = background
+    return background
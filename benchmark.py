@@ -0,0 +1,302 @@
+"""
+benchmark.py - Замеры горячих мест обновления и отрисовки
+
+Запускается без окна (фиктивные драйверы SDL) и печатает JSON с
+процентилями времени одного кадра (вызова) в миллисекундах.
+
+Примеры:
+    python benchmark.py
+    python benchmark.py --frames 500 --only particles --output bench.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Без окна и звуковой карты; в stdout - только JSON (без приветствия pygame)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+
+from settings import *
+
+# Количество объектов в сценариях
+PARTICLE_COUNTS = (10, 100, 1000, 10000)
+COIN_COUNTS = (3, 100, 1000)
+ENEMY_COUNTS = (1, 50, 500)
+PLATFORM_COUNTS = (10, 100, 1000)
+
+# Частиц тестового эффекта за кадр в пуле ParticleManager (при жизни
+# 40-80 кадров все сценарии упираются в MAX_PARTICLES)
+MANAGER_BURSTS = (50, 200, 1000)
+
+ENEMY_TYPES = ("patrol", "chaser", "shooter")
+COIN_TYPES = ("normal", "silver", "gold")
+
+
+def percentiles(samples):
+    """Процентили времени кадра в миллисекундах"""
+    values = np.array(samples) * 1000
+    return {
+        "p50": round(float(np.percentile(values, 50)), 4),
+        "p90": round(float(np.percentile(values, 90)), 4),
+        "p99": round(float(np.percentile(values, 99)), 4),
+        "mean": round(float(values.mean()), 4),
+        "max": round(float(values.max()), 4),
+    }
+
+
+def measure(func, frames, warmup=10, before=None):
+    """Время каждого из frames вызовов func (before вызывается вне замера)"""
+    samples = []
+    perf_counter = time.perf_counter
+    for i in range(warmup + frames):
+        if before is not None:
+            before()
+        start = perf_counter()
+        func()
+        elapsed = perf_counter() - start
+        if i >= warmup:
+            samples.append(elapsed)
+    return samples
+
+
+def make_level(coins=3, enemies=1):
+    """Уровень 1 с заданным количеством монет и врагов"""
+    from levels import LEVELS
+    level = dict(LEVELS[1])
+
+    # Монеты сеткой по экрану, враги - на земле
+    columns = max(1, int(coins ** 0.5 * WIDTH / HEIGHT))
+    level["coins"] = [
+        (40 + (i % columns) * (WIDTH - 80) // columns,
+         40 + (i // columns) * (HEIGHT - 160) // max(1, coins // columns),
+         10, COIN_TYPES[i % len(COIN_TYPES)])
+        for i in range(coins)
+    ]
+    level["enemies"] = [
+        (40 + i * (WIDTH - 120) // max(1, enemies), HEIGHT - 80, ENEMY_TYPES[i % len(ENEMY_TYPES)])
+        for i in range(enemies)
+    ]
+    level["required_score"] = 10 ** 9
+    return level
+
+
+def make_game(coins=3, enemies=1):
+    """Игра на уровне с заданным количеством объектов"""
+    from game import Game
+    game = Game(start_level=1, seed=0)
+    game.level_data = make_level(coins, enemies)
+    game.create_level()
+    return game
+
+
+def keep_playing(game):
+    """Не даем игре закончиться во время замера"""
+    game.game_over = False
+    game.level_complete = False
+    game.game_paused = False
+    game.player_lives = 3
+    game.invincibility_timer = 2
+
+
+def bench_game(frames):
+    results = []
+    for coins in COIN_COUNTS:
+        for enemies in ENEMY_COUNTS:
+            game = make_game(coins, enemies)
+            params = {"coins": coins, "enemies": enemies}
+            before = lambda: keep_playing(game)
+
+            results.append(("Game.update", params, measure(game.update, frames, before=before)))
+
+            # Созданные за кадр поверхности (Game.render_stats) снимаются вне замера
+            allocations = []
+
+            def before_draw():
+                keep_playing(game)
+                allocations.append(game.render_stats()["surface_allocations"])
+
+            samples = measure(game.draw, frames, before=before_draw)
+            allocations.append(game.render_stats()["surface_allocations"])
+            measured = allocations[-frames:]
+            stats = game.render_stats()
+            stats["max_frame_allocations"] = max(measured)
+            stats["measured_allocations"] = sum(measured)
+            results.append(("Game.draw", params, samples, stats))
+            results.append(("Game.draw_ui", params, measure(game.draw_ui, frames, before=before)))
+    return results
+
+
+def bench_particles(frames):
+    from particles import ParticleSystem
+    screen = pygame.display.get_surface()
+    results = []
+    for count in PARTICLE_COUNTS:
+        system = ParticleSystem()
+
+        def top_up():
+            if len(system) < count:
+                system.emit(WIDTH // 2, HEIGHT // 2, count=count - len(system),
+                            color=(255, 215, 0, 255), lifetime_range=(10 ** 6, 10 ** 6))
+
+        params = {"particles": count}
+        results.append(("ParticleSystem.update", params, measure(system.update, frames, before=top_up)))
+        results.append(("ParticleSystem.draw", params,
+                        measure(lambda: system.draw(screen), frames, before=top_up)))
+    return results
+
+
+def bench_particle_manager(frames):
+    """Пул частиц сверх MAX_PARTICLES: вытеснение по приоритету и сброс"""
+    from particles import (ParticleManager, ParticleSystem, create_collect_effect,
+                           create_enemy_death_effect, create_hit_effect, create_jump_effect)
+    results = []
+    for burst in MANAGER_BURSTS:
+        manager = ParticleManager()
+        frame_number = [0]
+        peak = [0]
+
+        def frame():
+            # Тестовый эффект (низший приоритет) каждый кадр, игровые - реже
+            n = frame_number[0]
+            test = ParticleSystem()
+            test.emit_circle(WIDTH // 2, HEIGHT // 2, count=burst, speed=3, lifetime=60)
+            manager.spawn(test, "test")
+            if n % 10 == 0:
+                manager.spawn(create_jump_effect(WIDTH // 3, HEIGHT - 60), "jump")
+            if n % 5 == 0:
+                manager.spawn(create_collect_effect(WIDTH // 2, HEIGHT // 3), "collect")
+            if n % 20 == 0:
+                manager.spawn(create_enemy_death_effect(WIDTH // 4, HEIGHT // 2), "enemy_death")
+            if n % 30 == 0:
+                manager.spawn(create_hit_effect(WIDTH // 2, HEIGHT // 2), "hit")
+            manager.update()
+            frame_number[0] = n + 1
+            peak[0] = max(peak[0], len(manager))
+
+        samples = measure(frame, frames)
+        stats = manager.stats()
+        stats["peak_live"] = peak[0]
+        params = {"burst": burst, "max_particles": manager.max_particles}
+        results.append(("ParticleManager.spawn+update", params, samples, stats))
+    return results
+
+
+def bench_coins(frames):
+    from coin import Coin
+    results = []
+    for count in COIN_COUNTS:
+        coins = [Coin(*data) for data in make_level(coins=count)["coins"]]
+
+        def update():
+            for coin in coins:
+                coin.update()
+
+        results.append(("Coin.update", {"coins": count}, measure(update, frames)))
+    return results
+
+
+def bench_collisions(frames):
+    from player import Player
+    from platform import Platform
+    results = []
+    for count in PLATFORM_COUNTS:
+        columns = max(1, int(count ** 0.5))
+        platforms = [Platform(i % columns * WIDTH // columns, 100 + i // columns * 400 // columns,
+                              TILE_SIZE, 20, "normal")
+                     for i in range(count)]
+        player = Player(WIDTH // 2, HEIGHT // 2)
+
+        def before():
+            player.rect.topleft = (WIDTH // 2, HEIGHT // 2)
+            player.vel_y = 5
+
+        results.append(("Player.handle_collisions", {"platforms": count},
+                        measure(lambda: player.handle_collisions(platforms), frames, before=before)))
+    return results
+
+
+def bench_audio(frames):
+    from audio import AudioManager
+    manager = AudioManager()
+    frames = max(1, frames // 10)
+    params = {"frequency": 440, "duration": 0.2}
+    # create_sound после первого вызова читает звук из дискового кэша,
+    # render_sound - чистый синтез
+    return [("AudioManager.create_sound", params,
+             measure(lambda: manager.create_sound(440, 0.2), frames, warmup=1)),
+            ("AudioManager.render_sound", params,
+             measure(lambda: manager.render_sound(440, 0.2), frames, warmup=1))]
+
+
+def bench_menu(frames):
+    from menu import MainMenu
+    menu = MainMenu(pygame.display.get_surface())
+
+    def frame():
+        menu.update_background()
+        menu.draw()
+
+    return [("MainMenu.draw", {}, measure(frame, frames))]
+
+
+BENCHMARKS = {
+    "game": bench_game,
+    "particles": bench_particles,
+    "particle_manager": bench_particle_manager,
+    "coins": bench_coins,
+    "collisions": bench_collisions,
+    "audio": bench_audio,
+    "menu": bench_menu,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры производительности")
+    parser.add_argument("--frames", type=int, default=200, help="замеряемых кадров на сценарий")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS),
+                        help="запустить только эти группы (можно несколько раз)")
+    parser.add_argument("--output", help="записать JSON в файл вместо вывода на экран")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+    pygame.display.set_mode((WIDTH, HEIGHT))
+
+    results = []
+    for name in args.only or BENCHMARKS:
+        # Сценарий может вернуть четвертым элементом свою статистику
+        for bench_name, params, samples, *extra in BENCHMARKS[name](args.frames):
+            result = {"name": bench_name, "params": params,
+                      "frames": len(samples), **percentiles(samples)}
+            if extra:
+                result["stats"] = extra[0]
+            results.append(result)
+
+    report = {
+        "environment": {
+            "python": sys.version.split()[0],
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "video_driver": pygame.display.get_driver(),
+        },
+        "results": results,
+    }
+    pygame.quit()
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,72 @@
 import pygame
 import math
-import random
 from settings import *
-from animations import create_coin_animations
+from rng import rng_streams
+from animations import animation_bank, create_coin_animations
+
+
+class CoinAtlas:
+    """Заранее собранные кадры монетки (одни и те же для всех типов)
+
+    frames[spin][glow] - все сочетания кадров вращения и мерцания,
+    collect_frames[timer] - увеличенные и полупрозрачные кадры сбора.
+    """
+
+    def __init__(self, frame_set_name="coin", collect_duration=20):
+        frame_set = animation_bank.get(frame_set_name)
+        spin_frames = frame_set["spin"][0]
+        glow_frames = frame_set["glow"][0]
+
+        # Комбинируем анимации
+        self.frames = tuple(
+            tuple(self.combine(spin_img, glow_img) for glow_img in glow_frames)
+            for spin_img in spin_frames
+        )
+
+        # Анимация сбора строится от первого кадра
+        base = self.frames[0][0]
+        self.collect_frames = tuple(
+            self.collect_frame(base, timer, collect_duration)
+            for timer in range(collect_duration)
+        )
+
+    def combine(self, spin_img, glow_img):
+        """Наложение мерцания на кадр вращения"""
+        image = pygame.Surface((24, 24), pygame.SRCALPHA)
+        image.blit(spin_img, (0, 0))
+        image.blit(glow_img, (0, 0), special_flags=pygame.BLEND_ALPHA_SDL2)
+        return image
+
+    def collect_frame(self, original_image, timer, duration):
+        """Кадр анимации сбора: увеличение и исчезновение"""
+        scale = 1 + (timer / duration) * 2
+        alpha = int(255 * (1 - timer / duration))
+
+        # Масштабируем оригинальное изображение
+        orig_size = original_image.get_size()
+        new_size = (int(orig_size[0] * scale), int(orig_size[1] * scale))
+        scaled = pygame.transform.scale(original_image, new_size)
+
+        # Поверхность с альфа-каналом для прозрачности
+        image = pygame.Surface(new_size, pygame.SRCALPHA)
+        scaled.set_alpha(alpha)
+        image.blit(scaled, (0, 0))
+        return image
+
+
+# Атласы по набору кадров и длине сбора (общие для всех монеток).
+# Тип монетки на кадры не влияет - он меняет только цвет эффекта сбора.
+coin_atlases = {}
+
+
+def get_coin_atlas(frame_set_name="coin", collect_duration=20):
+    """Атлас кадров монетки (строится один раз)"""
+    key = (frame_set_name, collect_duration)
+    atlas = coin_atlases.get(key)
+    if atlas is None:
+        atlas = CoinAtlas(frame_set_name, collect_duration)
+        coin_atlases[key] = atlas
+    return atlas
 
 
 class Coin(pygame.sprite.Sprite):
@@ -11,12 +75,13 @@ class Coin(pygame.sprite.Sprite):
 
         self.value = value
         self.coin_type = coin_type
+        self.atlas = get_coin_atlas()
         self.animations = create_coin_animations()
-        self.image = self.animations["spin"].get_current_image()
+        self.image = self.atlas.frames[0][0]
 
         # Для анимации парения - фиксированная начальная позиция
         self.base_y = y  # Запоминаем исходную позицию
-        self.float_offset = random.random() * 2 * math.pi
+        self.float_offset = rng_streams.get("coins").random() * 2 * math.pi
         self.float_speed = 0.05
         self.float_amplitude = 2
 
@@ -28,10 +93,7 @@ class Coin(pygame.sprite.Sprite):
         # Для сбора
         self.collected = False
         self.collect_timer = 0
-        self.collect_duration = 20
-
-        # Сохраняем оригинальное изображение для анимации сбора
-        self.original_image = self.image.copy()
+        self.collect_duration = len(self.atlas.collect_frames)
 
     def update(self):
         """Анимация парения и вращения"""
@@ -40,42 +102,20 @@ class Coin(pygame.sprite.Sprite):
             self.animations["spin"].update()
             self.animations["glow"].update()
 
-            # Комбинируем анимации
-            spin_img = self.animations["spin"].get_current_image()
-            glow_img = self.animations["glow"].get_current_image()
-
-            # Создаем новое изображение
-            self.image = pygame.Surface((24, 24), pygame.SRCALPHA)
-            self.image.blit(spin_img, (0, 0))
-            self.image.blit(glow_img, (0, 0), special_flags=pygame.BLEND_ALPHA_SDL2)
+            # Готовое сочетание кадров из атласа
+            spin_index = self.animations["spin"].get_current_index()
+            glow_index = self.animations["glow"].get_current_index()
+            self.image = self.atlas.frames[spin_index][glow_index]
 
             # Парение вокруг base_y
             self.float_offset += self.float_speed
             float_y = math.sin(self.float_offset) * self.float_amplitude
             self.rect.y = self.base_y + float_y
-
-            # Сохраняем оригинальное изображение
-            self.original_image = self.image.copy()
         else:
             # Анимация сбора
             self.collect_timer += 1
             if self.collect_timer < self.collect_duration:
-                # Увеличение и исчезновение
-                scale = 1 + (self.collect_timer / self.collect_duration) * 2
-                alpha = int(255 * (1 - self.collect_timer / self.collect_duration))
-
-                # Масштабируем оригинальное изображение
-                orig_size = self.original_image.get_size()
-                new_size = (int(orig_size[0] * scale), int(orig_size[1] * scale))
-
-                # Создаем новую поверхность с альфа-каналом
-                scaled = pygame.transform.scale(self.original_image, new_size)
-
-                # Создаем поверхность с альфа-каналом для прозрачности
-                self.image = pygame.Surface(new_size, pygame.SRCALPHA)
-                scaled_with_alpha = scaled.copy()
-                scaled_with_alpha.set_alpha(alpha)
-                self.image.blit(scaled_with_alpha, (0, 0))
+                self.image = self.atlas.collect_frames[self.collect_timer]
 
                 # Обновляем rect с сохранением центра
                 old_center = self.rect.center
@@ -0,0 +1,87 @@
+"""
+controls.py - Управление: клавиши превращаются в битовую маску действий
+
+Игра получает не события pygame, а маску действий за кадр, поэтому
+ввод можно подать из скрипта, случайно или из записи.
+"""
+import pygame
+
+# Действия (биты маски)
+LEFT = 1
+RIGHT = 2
+JUMP = 4
+RESTART = 8
+PAUSE = 16
+NEXT = 32
+TEST_EFFECT = 64
+MENU = 128
+QUIT = 256
+PROFILER = 512
+
+# Действия, которые срабатывают один раз в момент нажатия
+PRESS_ACTIONS = JUMP | RESTART | PAUSE | NEXT | TEST_EFFECT | MENU | QUIT | PROFILER
+
+# Действия интерфейса: срабатывают сразу в кадре и не входят в симуляцию
+UI_ACTIONS = MENU | QUIT | PROFILER
+
+# Действия удерживаемых клавиш (применяются на каждом шаге симуляции)
+HELD_ACTIONS = LEFT | RIGHT
+
+# Удерживаемые клавиши
+HELD_KEYS = {
+    LEFT: (pygame.K_LEFT, pygame.K_a),
+    RIGHT: (pygame.K_RIGHT, pygame.K_d),
+}
+
+# Клавиши-нажатия
+PRESSED_KEYS = {
+    pygame.K_SPACE: JUMP,
+    pygame.K_r: RESTART,
+    pygame.K_ESCAPE: PAUSE,
+    pygame.K_n: NEXT,
+    pygame.K_p: TEST_EFFECT,
+    pygame.K_m: MENU,
+    pygame.K_F3: PROFILER,
+}
+
+# Имена действий для скриптов ввода
+ACTION_NAMES = {
+    "left": LEFT,
+    "right": RIGHT,
+    "jump": JUMP,
+    "restart": RESTART,
+    "pause": PAUSE,
+    "next": NEXT,
+    "test": TEST_EFFECT,
+    "menu": MENU,
+    "quit": QUIT,
+    "profiler": PROFILER,
+}
+
+
+def read_input():
+    """Маска действий за кадр из событий и состояния клавиатуры"""
+    mask = 0
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            mask |= QUIT
+        elif event.type == pygame.KEYDOWN:
+            mask |= PRESSED_KEYS.get(event.key, 0)
+
+    keys = pygame.key.get_pressed()
+    for action, key_list in HELD_KEYS.items():
+        if any(keys[key] for key in key_list):
+            mask |= action
+
+    return mask
+
+
+def parse_actions(text):
+    """Маска из имен действий: "right+jump" или "right jump" """
+    mask = 0
+    for name in text.replace("+", " ").split():
+        name = name.lower()
+        if name not in ACTION_NAMES:
+            raise ValueError(f"Неизвестное действие: {name}")
+        mask |= ACTION_NAMES[name]
+    return mask
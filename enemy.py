@@ -3,30 +3,53 @@ import math
 from settings import *
 
 
+def create_enemy_image(enemy_type):
+    """Создание изображения врага"""
+    image = pygame.Surface((40, 40))
+
+    if enemy_type == "patrol":
+        image.fill(RED)
+    elif enemy_type == "chaser":
+        image.fill((255, 0, 255))
+    elif enemy_type == "shooter":
+        image.fill((255, 100, 0))
+
+    # Рисуем глаза
+    pygame.draw.circle(image, WHITE, (10, 10), 6)
+    pygame.draw.circle(image, WHITE, (30, 10), 6)
+    pygame.draw.circle(image, BLACK, (10, 10), 3)
+    pygame.draw.circle(image, BLACK, (30, 10), 3)
+
+    # Рот
+    pygame.draw.arc(image, BLACK, (10, 20, 20, 15), 3.14, 6.28, 2)
+
+    return image
+
+
+# Изображения врагов по типу: (вправо, влево) - общие для всех врагов
+enemy_images = {}
+
+
+def get_enemy_images(enemy_type):
+    """Изображения врага для обоих направлений (строятся один раз)"""
+    images = enemy_images.get(enemy_type)
+    if images is None:
+        image = create_enemy_image(enemy_type)
+        images = (image, pygame.transform.flip(image, True, False))
+        enemy_images[enemy_type] = images
+    return images
+
+
 class Enemy(pygame.sprite.Sprite):
     def __init__(self, x, y, enemy_type="patrol"):
         super().__init__()
 
         self.enemy_type = enemy_type
 
-        # Создаем изображение врага
-        self.image = pygame.Surface((40, 40))
-
-        if enemy_type == "patrol":
-            self.image.fill(RED)
-        elif enemy_type == "chaser":
-            self.image.fill((255, 0, 255))
-        elif enemy_type == "shooter":
-            self.image.fill((255, 100, 0))
-
-        # Рисуем глаза
-        pygame.draw.circle(self.image, WHITE, (10, 10), 6)
-        pygame.draw.circle(self.image, WHITE, (30, 10), 6)
-        pygame.draw.circle(self.image, BLACK, (10, 10), 3)
-        pygame.draw.circle(self.image, BLACK, (30, 10), 3)
-
-        # Рот
-        pygame.draw.arc(self.image, BLACK, (10, 20, 20, 15), 3.14, 6.28, 2)
+        # Изображения для обоих направлений
+        self.images = get_enemy_images(enemy_type)
+        self.facing_right = True
+        self.image = self.images[0]
 
         # Создаем прямоугольник
         self.rect = self.image.get_rect()
@@ -73,10 +96,10 @@ class Enemy(pygame.sprite.Sprite):
 
         if self.rect.x > self.start_x + self.patrol_range:
             self.direction = -1
-            self.image = pygame.transform.flip(self.image, True, False)
+            self.set_facing(False)
         elif self.rect.x < self.start_x:
             self.direction = 1
-            self.image = pygame.transform.flip(self.image, True, False)
+            self.set_facing(True)
 
     def chase(self, player):
         """Преследование игрока"""
@@ -86,10 +109,15 @@ class Enemy(pygame.sprite.Sprite):
         if distance < self.sight_range:
             if dx > 10:
                 self.rect.x += self.chase_speed
-                self.image = pygame.transform.flip(self.image, True, False)
+                self.set_facing(True)
             elif dx < -10:
                 self.rect.x -= self.chase_speed
-                self.image = pygame.transform.flip(self.image, False, False)
+                self.set_facing(False)
+
+    def set_facing(self, right):
+        """Поворот врага - просто выбор готового изображения"""
+        self.facing_right = right
+        self.image = self.images[0] if right else self.images[1]
 
     def shoot(self, player):
         """Стрельба в игрока"""
@@ -112,9 +140,13 @@ class Enemy(pygame.sprite.Sprite):
             return True
         return False
 
-    def draw_bullets(self, screen):
+    def draw_bullets(self, screen, offset=(0, 0)):
         """Отрисовка пуль"""
-        self.bullets.draw(screen)
+        if offset == (0, 0):
+            self.bullets.draw(screen)
+        else:
+            screen.blits([(bullet.image, bullet.rect.move(offset)) for bullet in self.bullets],
+                         doreturn=False)
 
 
 class Bullet(pygame.sprite.Sprite):
@@ -1,28 +1,226 @@
 """
 fonts.py - Простая система шрифтов
 """
+from collections import OrderedDict
+
 import pygame
 
+# Размеры шрифтов
+FONT_SIZES = {
+    "small": 20,
+    "medium": 28,
+    "large": 36,
+    "title": 48,
+}
+DEFAULT_FONT_SIZE = 28
+
+# Сколько отрендеренных строк держим в кэше
+TEXT_CACHE_SIZE = 256
+
+# Символы, которые заранее растеризуются в атлас глифов
+ATLAS_CHARSET = (
+    "".join(chr(code) for code in range(32, 127)) +
+    "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ"
+    "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+    "←→№"
+)
+
+
+class FontRegistry:
+    """Реестр шрифтов - каждый размер загружается один раз"""
+
+    def __init__(self):
+        self.fonts = {}
+
+    def get(self, size="medium"):
+        """Получение шрифта по имени размера"""
+        font_size = FONT_SIZES.get(size, DEFAULT_FONT_SIZE)
+        font = self.fonts.get(font_size)
+        if font is None:
+            try:
+                font = pygame.font.Font(None, font_size)
+            except:
+                font = pygame.font.SysFont("arial", font_size)
+            self.fonts[font_size] = font
+        return font
+
+    def clear(self):
+        """Сброс загруженных шрифтов (например, после pygame.font.quit)"""
+        self.fonts.clear()
+
+
+class TextCache:
+    """LRU-кэш отрендеренных строк по ключу (текст, размер, цвет)"""
+
+    def __init__(self, registry, max_size=TEXT_CACHE_SIZE):
+        self.registry = registry
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+        # Статистика
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, text, size="medium", color=(255, 255, 255)):
+        """Получение поверхности с текстом (из кэша или рендер)"""
+        key = (text, size, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.registry.get(size).render(text, True, color)
+        self.surfaces[key] = surface
+
+        # Выкидываем самые старые строки
+        while len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+
+        return surface
+
+    def stats(self):
+        """Статистика работы кэша"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.surfaces),
+            "max_size": self.max_size,
+        }
+
+    def clear(self):
+        """Очистка кэша и статистики"""
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+class GlyphAtlas:
+    """Атлас глифов одного размера и цвета
+
+    Все символы растеризуются один раз в общую поверхность, а строка
+    собирается из готовых глифов одним вызовом Surface.blits - для
+    часто меняющихся строк (счёт, таймер, FPS) шрифт больше не рендерится.
+    """
+
+    def __init__(self, font, color, charset=ATLAS_CHARSET):
+        self.font = font
+        self.color = tuple(color)
+        # Высота строки атласа - по самому высокому глифу: get_height()
+        # меньше поверхностей font.render, и у р, у, g, j обрезались хвосты
+        self.height = 0
+        self.glyphs = {}
+        self.surface = None
+
+        # Сколько символов пришлось дорисовывать вне набора
+        self.misses = 0
+
+        self.build(charset)
+
+    def build(self, charset):
+        """Растеризация набора символов в одну поверхность"""
+        chars = [char for char in dict.fromkeys(charset) if char not in self.glyphs]
+        if not chars:
+            return
+
+        rendered = [(char, self.font.render(char, True, self.color)) for char in chars]
+
+        old_surface = self.surface
+        old_width = old_surface.get_width() if old_surface else 0
+        new_width = old_width + sum(glyph.get_width() for _, glyph in rendered)
+        self.height = max(self.height, max(glyph.get_height() for _, glyph in rendered))
+
+        surface = pygame.Surface((max(new_width, 1), self.height), pygame.SRCALPHA)
+        # BLEND_RGBA_MAX копирует пиксели без повторного смешивания альфы
+        if old_surface:
+            surface.blit(old_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+
+        x = old_width
+        for char, glyph in rendered:
+            surface.blit(glyph, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            self.glyphs[char] = pygame.Rect(x, 0, glyph.get_width(), self.height)
+            x += glyph.get_width()
+
+        # Атлас мог стать выше - старые глифы получают ту же высоту
+        for area in self.glyphs.values():
+            area.height = self.height
+
+        self.surface = surface
+
+    def ensure(self, text):
+        """Дорисовка символов, которых нет в атласе"""
+        missing = [char for char in text if char not in self.glyphs]
+        if missing:
+            self.misses += len(missing)
+            self.build(missing)
+
+    def size(self, text):
+        """Размер строки в пикселях"""
+        self.ensure(text)
+        glyphs = self.glyphs
+        return sum(glyphs[char].width for char in text), self.height
+
+    def blit(self, target, text, pos):
+        """Отрисовка строки прямо на целевую поверхность"""
+        self.ensure(text)
+        glyphs = self.glyphs
+        surface = self.surface
+        x, y = pos
+        start_x = x
+
+        batch = []
+        for char in text:
+            area = glyphs[char]
+            batch.append((surface, (x, y), area))
+            x += area.width
+
+        target.blits(batch, doreturn=False)
+        return pygame.Rect(start_x, y, x - start_x, self.height)
+
+    def render(self, text):
+        """Сборка строки в отдельную поверхность"""
+        width, height = self.size(text)
+        surface = pygame.Surface((max(width, 1), height), pygame.SRCALPHA)
+        self.blit(surface, text, (0, 0))
+        return surface
+
+
+class GlyphAtlasCache:
+    """Атласы глифов по ключу (размер, цвет)"""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.atlases = {}
+
+    def get(self, size="medium", color=(255, 255, 255)):
+        """Получение атласа (создается при первом обращении)"""
+        key = (size, tuple(color))
+        atlas = self.atlases.get(key)
+        if atlas is None:
+            atlas = GlyphAtlas(self.registry.get(size), color)
+            self.atlases[key] = atlas
+        return atlas
+
+    def clear(self):
+        """Сброс всех атласов"""
+        self.atlases.clear()
+
+
+# Глобальные экземпляры
+font_registry = FontRegistry()
+text_cache = TextCache(font_registry)
+glyph_atlases = GlyphAtlasCache(font_registry)
+
 
 def render_text(text, size="medium", color=(255, 255, 255)):
-    """Рендеринг текста"""
-    # Выбираем размер шрифта
-    if size == "small":
-        font_size = 20
-    elif size == "medium":
-        font_size = 28
-    elif size == "large":
-        font_size = 36
-    elif size == "title":
-        font_size = 48
-    else:
-        font_size = 28
-
-    # Создаем шрифт
-    try:
-        font = pygame.font.Font(None, font_size)
-    except:
-        font = pygame.font.SysFont("arial", font_size)
-
-    # Рендерим текст
-    return font.render(text, True, color)
\ No newline at end of file
+    """Рендеринг текста
+
+    Возвращаемая поверхность общая для всех вызовов с тем же текстом,
+    поэтому изменять её нельзя - только рисовать.
+    """
+    return text_cache.render(text, size, color)
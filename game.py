@@ -1,46 +1,114 @@
 import pygame
 import sys
-import random
 import math
+import random
+import hashlib
 
-from fonts import render_text
+from fonts import render_text, glyph_atlases
+from hud import Hud, HudWidget, render_hearts, render_lines
 from settings import *
 from player import Player
 from platform import Platform
 from coin import Coin
 from enemy import Enemy
-from levels import get_level_data, get_background_color
+from levels import get_level_data
+from backgrounds import get_background
 from particles import (
-    ParticleSystem, create_collect_effect, create_jump_effect,
+    ParticleSystem, ParticleManager, create_collect_effect, create_jump_effect,
     create_enemy_death_effect, create_hit_effect
 )
 from audio import audio_manager
+from spatial import SpatialHash
+from renderer import DirtyRectRenderer, RenderTargets
+from settings_store import settings_store
+from rng import rng_streams
+from profiler import profiler
+from tracing import tracer
+import controls
+
+
+def create_outline_surface(image):
+    """Белый полупрозрачный контур по форме кадра"""
+    mask = pygame.mask.from_surface(image)
+    outline = mask.to_surface(setcolor=WHITE, unsetcolor=None)
+    outline.set_alpha(150)
+    return outline
+
+
+# Цвет пустого места на слое статичных платформ
+LAYER_COLORKEY = (255, 0, 254)
 
 
 class Game:
-    def __init__(self, start_level=1):
+    def __init__(self, start_level=1, dirty_rects=None, headless=False, seed=None, record=None):
         # ВСЁ уже инициализировано в main.py
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption(f"Мой Платформер - Уровень {start_level}")
+        # headless=True - только симуляция: без окна, музыки и отрисовки
+        # seed - зерно генераторов (с одним зерном и вводом игра повторяется)
+        # record - файл, куда записывается ввод для replay.py
+        self.headless = headless
+
+        if seed is None and record:
+            seed = random.randrange(2 ** 32)
+        if seed is not None:
+            rng_streams.seed(seed)
+        self.seed = rng_streams.base_seed
+
+        self.recorder = None
+        if record:
+            from replay import InputRecorder
+            self.recorder = InputRecorder(record, start_level, self.seed)
+
+        self.screen = None
+        if not headless:
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         self.clock = pygame.time.Clock()
 
         # Группы спрайтов
         self.all_sprites = pygame.sprite.Group()
+
+        # Спрайты, которые двигаются или анимируются (рисуются каждый кадр)
+        self.dynamic_sprites = pygame.sprite.Group()
         self.platforms = pygame.sprite.Group()
         self.coins = pygame.sprite.Group()
         self.enemies = pygame.sprite.Group()
 
-        # Системы частиц
-        self.particle_systems = []
+        # Пространственные сетки для поиска столкновений
+        self.platform_grid = SpatialHash(TILE_SIZE)
+        self.coin_grid = SpatialHash(TILE_SIZE)
+        self.enemy_grid = SpatialHash(TILE_SIZE)
+        self.bullet_grid = SpatialHash(TILE_SIZE)
+        self.moving_platforms = []
+
+        # Все частицы игры в одном пуле с общим лимитом
+        self.particles = ParticleManager(max_particles=MAX_PARTICLES)
 
         # Текущий уровень
         self.current_level = start_level
         self.level_data = get_level_data(self.current_level)
+        self.update_caption()
 
         # Создание игрока
         start_x, start_y = self.level_data["player_start"]
         self.player = Player(start_x, start_y)
         self.all_sprites.add(self.player)
+        self.dynamic_sprites.add(self.player)
+
+        # Фон уровня и заранее отрисованный слой статичных платформ
+        self.background = None
+        self.level_layer = None
+
+        # Режим перерисовки только изменившихся областей (по настройке)
+        if headless:
+            dirty_rects = False
+        elif dirty_rects is None:
+            dirty_rects = settings_store.get("dirty_rects")
+        self.dirty_renderer = DirtyRectRenderer() if dirty_rects else None
+
+        # Постоянные поверхности (затемнения, вспышка, облака, контуры)
+        self.render_targets = RenderTargets()
+
+        # Положения спрайтов до последнего шага симуляции (для интерполяции)
+        self.previous_positions = {}
 
         # Создание уровня
         self.create_level()
@@ -54,6 +122,15 @@ class Game:
         self.game_over = False
         self.level_complete = False
 
+        # Ввод для следующего шага: нажатия с прошлого шага и
+        # удерживаемые клавиши последнего кадра (см. apply_input)
+        self.pressed_actions = 0
+        self.held_actions = 0
+
+        # Рекорд для экрана Game Over (читается один раз, в save_high_score)
+        self.high_score = 0
+        self.new_high_score = False
+
         # Время и таймеры
         self.level_time = 0
         self.invincibility_timer = 0
@@ -64,39 +141,69 @@ class Game:
         self.flash_color = None
         self.flash_alpha = 0
 
+        # Интерфейс
+        self.hud = None if headless else self.create_hud()
+
         # Запускаем музыку (если не играет)
-        if not audio_manager.music_playing:
+        if not headless and not audio_manager.music_playing:
             audio_manager.play_music()
 
+    @tracer.traced("create_level", "level")
     def create_level(self):
         """Создание уровня из данных"""
+        # Подхватываем изменения файла настроек (вне игрового цикла)
+        settings_store.refresh()
+
         # Очищаем предыдущий уровень
         self.all_sprites.empty()
+        self.dynamic_sprites.empty()
         self.platforms.empty()
         self.coins.empty()
         self.enemies.empty()
-        self.particle_systems.clear()
+        self.particles.clear()
+
+        self.platform_grid.clear()
+        self.coin_grid.clear()
+        self.enemy_grid.clear()
+        self.bullet_grid.clear()
+        self.moving_platforms = []
 
         # Добавляем игрока
         self.all_sprites.add(self.player)
+        self.dynamic_sprites.add(self.player)
 
         # Создаем платформы
         for plat_data in self.level_data["platforms"]:
             platform = Platform(*plat_data)
             self.all_sprites.add(platform)
             self.platforms.add(platform)
+            self.platform_grid.insert(platform)
+            if platform.platform_type == "moving":
+                self.moving_platforms.append(platform)
+                self.dynamic_sprites.add(platform)
 
         # Создаем монетки
         for coin_data in self.level_data["coins"]:
             coin = Coin(*coin_data)
             self.all_sprites.add(coin)
             self.coins.add(coin)
+            self.dynamic_sprites.add(coin)
+            self.coin_grid.insert(coin)
 
         # Создаем врагов
         for enemy_data in self.level_data["enemies"]:
             enemy = Enemy(*enemy_data)
             self.all_sprites.add(enemy)
             self.enemies.add(enemy)
+            self.dynamic_sprites.add(enemy)
+            self.enemy_grid.insert(enemy)
+
+        # Слои фона и статичные платформы рисуются один раз
+        if not self.headless:
+            self.background = get_background(self.level_data["background"])
+            self.level_layer = self.bake_level_layer()
+        if self.dirty_renderer is not None:
+            self.dirty_renderer.invalidate()
 
         # Сброс состояния игрока
         start_x, start_y = self.level_data["player_start"]
@@ -111,48 +218,160 @@ class Game:
         self.invincibility_timer = 0
         self.screen_shake = 0
 
-    def handle_events(self):
-        """Обработка событий"""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.quit_game()
-
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    if not self.game_paused and not self.game_over and not self.level_complete:
-                        jump_effect = self.player.jump()
-                        if jump_effect:
-                            self.particle_systems.append(jump_effect)
-                            audio_manager.play_sound("jump")
+        # Новый уровень рисуется без сглаживания с прошлым
+        self.previous_positions = {}
 
-                if event.key == pygame.K_r:
-                    self.restart_level()
+    def bake_level_layer(self):
+        """Отрисовка статичных платформ в одну поверхность"""
+        layer = pygame.Surface((WIDTH, HEIGHT))
+        if pygame.display.get_surface() is not None:
+            layer = layer.convert()
 
-                if event.key == pygame.K_ESCAPE:
-                    self.game_paused = not self.game_paused
+        # Пустое место прозрачно (цветовой ключ) - под ним видны слои фона
+        layer.fill(LAYER_COLORKEY)
+        layer.set_colorkey(LAYER_COLORKEY, pygame.RLEACCEL)
+        for platform in self.platforms:
+            if platform not in self.dynamic_sprites:
+                layer.blit(platform.image, platform.rect)
 
-                if event.key == pygame.K_n and (self.game_over or self.level_complete):
-                    if self.game_over:
-                        self.restart_game()
-                    else:
-                        self.next_level()
+        return layer
 
-                if event.key == pygame.K_p:
-                    # Тестовая кнопка для эффектов
-                    self.create_test_effect()
+    def handle_events(self):
+        """Обработка событий"""
+        self.apply_input(controls.read_input())
+
+    def apply_input(self, actions):
+        """Маска действий (см. controls) за кадр отрисовки
+
+        Действия интерфейса срабатывают сразу. Остальные применяются на
+        ближайшем шаге симуляции (step): нажатия между шагами копятся,
+        удерживаемые клавиши берутся из последнего кадра. Так игра и
+        повтор записи (replay.py) проходят один и тот же путь.
+        """
+        if actions & controls.QUIT:
+            self.quit_game()
+
+        if actions & controls.MENU:  # M - вернуться в меню
+            self.return_to_menu()
+
+        if actions & controls.PROFILER:  # F3 - профилировщик кадра
+            profiler.toggle()
+            if self.dirty_renderer is not None:
+                self.dirty_renderer.invalidate()
+
+        self.pressed_actions |= actions & controls.PRESS_ACTIONS & ~controls.UI_ACTIONS
+        self.held_actions = actions & controls.HELD_ACTIONS
+
+    def apply_actions(self, actions):
+        """Применение ввода шага симуляции"""
+        if actions & controls.JUMP:
+            if not self.game_paused and not self.game_over and not self.level_complete:
+                jump_effect = self.player.jump()
+                if jump_effect:
+                    self.particles.spawn(jump_effect, "jump")
+                    audio_manager.play_sound("jump")
+
+        if actions & controls.RESTART:
+            self.restart_level()
+
+        if actions & controls.PAUSE:
+            self.game_paused = not self.game_paused
+
+            # Настройки могли поменять снаружи, пока игра стояла
+            if not self.game_paused:
+                settings_store.refresh()
+
+        if actions & controls.NEXT and (self.game_over or self.level_complete):
+            if self.game_over:
+                self.restart_game()
+            else:
+                self.next_level()
 
-                if event.key == pygame.K_m:  # M - вернуться в меню
-                    self.return_to_menu()
+        if actions & controls.TEST_EFFECT:
+            # Тестовая кнопка для эффектов
+            self.create_test_effect()
 
         # Непрерывное движение (только если игра не на паузе)
         if not self.game_paused and not self.game_over and not self.level_complete:
-            keys = pygame.key.get_pressed()
             self.player.vel_x = 0
-            if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+            if actions & controls.LEFT:
                 self.player.move_left()
-            if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+            if actions & controls.RIGHT:
                 self.player.move_right()
 
+    def step(self):
+        """Один шаг симуляции фиксированной длины"""
+        actions = self.pressed_actions | self.held_actions
+        self.pressed_actions = 0
+
+        self.previous_positions = {sprite: sprite.rect.topleft
+                                   for sprite in self.interpolated_sprites()}
+        if self.recorder is not None:
+            self.recorder.record_step(self, actions)
+        self.apply_actions(actions)
+        self.update()
+
+    def state_hash(self):
+        """Хеш состояния симуляции (для проверки повторов)"""
+        player = self.player
+        state = (
+            self.current_level, self.score, self.player_lives, self.level_time,
+            self.game_paused, self.game_over, self.level_complete,
+            self.invincibility_timer, self.screen_shake,
+            tuple(player.rect), player.vel_x, player.vel_y, player.on_ground,
+            tuple((tuple(coin.rect), coin.collected) for coin in self.coins),
+            tuple((tuple(enemy.rect), enemy.direction) for enemy in self.enemies),
+            tuple(tuple(bullet.rect) for enemy in self.enemies
+                  if enemy.enemy_type == "shooter" for bullet in enemy.bullets),
+            tuple(platform.rect.topleft for platform in self.moving_platforms),
+            len(self.particles),
+        )
+        return hashlib.sha1(repr(state).encode("utf-8")).hexdigest()
+
+    def stop_recording(self):
+        """Последний шаг с накопленным вводом и сохранение записи"""
+        if self.recorder is None:
+            return
+        self.step()
+        self.recorder.save(self)
+        self.recorder = None
+
+    def interpolated_sprites(self):
+        """Движущиеся спрайты, положение которых сглаживается при отрисовке"""
+        sprites = list(self.dynamic_sprites)
+        for enemy in self.enemies:
+            if enemy.enemy_type == "shooter":
+                sprites.extend(enemy.bullets)
+        return sprites
+
+    def apply_interpolation(self, alpha):
+        """Сдвиг спрайтов между прошлым и текущим шагом
+
+        Возвращает настоящие положения для restore_positions.
+        """
+        restore = []
+        if alpha >= 1:
+            return restore
+
+        for sprite, (old_x, old_y) in self.previous_positions.items():
+            x, y = sprite.rect.topleft
+            if (x, y) == (old_x, old_y) or not sprite.alive():
+                continue
+            # Телепорт (возрождение, смена уровня) не сглаживаем
+            if (abs(x - old_x) > INTERPOLATION_MAX_DISTANCE or
+                    abs(y - old_y) > INTERPOLATION_MAX_DISTANCE):
+                continue
+
+            restore.append((sprite, (x, y)))
+            sprite.rect.topleft = (round(old_x + (x - old_x) * alpha),
+                                   round(old_y + (y - old_y) * alpha))
+        return restore
+
+    def restore_positions(self, restore):
+        """Возврат спрайтов в настоящие положения после отрисовки"""
+        for sprite, pos in restore:
+            sprite.rect.topleft = pos
+
     def update(self):
         """Обновление игры"""
         if self.game_paused or self.game_over or self.level_complete:
@@ -173,32 +392,37 @@ class Game:
         if self.screen_shake > 0:
             self.screen_shake = max(0, self.screen_shake - 1)
 
-        # Обновление всех спрайтов
-        self.all_sprites.update()
+        # Обновление всех спрайтов (статичным платформам обновлять нечего)
+        self.dynamic_sprites.update()
+        profiler.mark("update.sprites")
 
         # Передаем игрока врагам для ИИ
         for enemy in self.enemies:
             enemy.update(self.player)
+        profiler.mark("update.enemy_ai")
 
         # Обновление систем частиц
-        for particle_system in self.particle_systems[:]:
-            particle_system.update()
-            if not particle_system.particles:
-                self.particle_systems.remove(particle_system)
+        self.particles.update()
+        profiler.mark("update.particles")
+
+        # Пересчет ячеек сетки для сдвинувшихся спрайтов
+        self.update_spatial_grids()
 
         # Обработка столкновений игрока с платформами
-        self.player.handle_collisions(self.platforms)
+        # (с запасом по высоте - игрок может сместиться при столкновении)
+        search_rect = self.player.rect.inflate(0, 2 * abs(self.player.vel_y) + 2)
+        self.player.handle_collisions(self.platform_grid.query_rect(search_rect))
 
         # Проверка сбора монет
-        collected_coins = pygame.sprite.spritecollide(
-            self.player, self.coins, False)
+        collected_coins = self.coin_grid.query_rect(self.player.rect)
 
         coins_to_remove = []
         for coin in collected_coins:
             if not coin.collected:
                 collect_effect = coin.collect()
+                self.coin_grid.remove(coin)
                 if collect_effect:
-                    self.particle_systems.append(collect_effect)
+                    self.particles.spawn(collect_effect, "collect")
                     audio_manager.play_sound("coin")
 
                 self.score += coin.value
@@ -209,8 +433,7 @@ class Game:
 
         # Проверка столкновения с врагами (если не неуязвим)
         if self.invincibility_timer == 0:
-            hit_enemies = pygame.sprite.spritecollide(
-                self.player, self.enemies, False)
+            hit_enemies = self.enemy_grid.query_rect(self.player.rect)
 
             for enemy in hit_enemies:
                 # Проверяем, если игрок прыгнул на врага сверху
@@ -218,13 +441,14 @@ class Game:
                         self.player.rect.bottom <= enemy.rect.centery + 20):
                     # Убиваем врага
                     if enemy.take_damage():
+                        self.remove_enemy_from_grids(enemy)
                         self.score += 50
                         audio_manager.play_sound("enemy_death")
 
                         # Эффект смерти врага
                         death_effect = create_enemy_death_effect(
                             enemy.rect.centerx, enemy.rect.centery)
-                        self.particle_systems.append(death_effect)
+                        self.particles.spawn(death_effect, "enemy_death")
 
                         # Тряска экрана при убийстве врага
                         self.screen_shake = 15
@@ -236,12 +460,12 @@ class Game:
                     self.take_damage(enemy)
 
         # Проверка столкновения с пулями (для стреляющих врагов)
-        for enemy in self.enemies:
-            if enemy.enemy_type == "shooter":
-                hit_bullets = pygame.sprite.spritecollide(
-                    self.player, enemy.bullets, True)
-                if hit_bullets and self.invincibility_timer == 0:
-                    self.take_damage(None)
+        hit_bullets = self.bullet_grid.query_rect(self.player.rect)
+        for bullet in hit_bullets:
+            bullet.kill()
+            self.bullet_grid.remove(bullet)
+        if hit_bullets and self.invincibility_timer == 0:
+            self.take_damage(None)
 
         # Проверка выпадения за экран
         if self.player.rect.top > HEIGHT + 100:
@@ -251,6 +475,27 @@ class Game:
         if len(self.coins) == 0 and self.score >= self.level_data["required_score"]:
             self.complete_level()
 
+        profiler.mark("update.collisions")
+
+    def update_spatial_grids(self):
+        """Поддержка сеток в актуальном состоянии после движения спрайтов"""
+        # Статичные платформы не двигаются - пересчитываем только движущиеся
+        self.platform_grid.update_all(self.moving_platforms)
+        self.coin_grid.update_all(coin for coin in self.coins if not coin.collected)
+        self.enemy_grid.update_all(self.enemies)
+
+        # Новые пули добавляются, исчезнувшие - удаляются
+        for enemy in self.enemies:
+            if enemy.enemy_type == "shooter":
+                self.bullet_grid.update_all(enemy.bullets)
+        self.bullet_grid.prune()
+
+    def remove_enemy_from_grids(self, enemy):
+        """Удаление убитого врага и его пуль из сеток"""
+        self.enemy_grid.remove(enemy)
+        for bullet in enemy.bullets:
+            self.bullet_grid.remove(bullet)
+
     def take_damage(self, enemy=None, fall_damage=False):
         """Игрок получает урон"""
         self.player_lives -= 1
@@ -259,7 +504,7 @@ class Game:
         # Эффект получения урона
         hit_effect = create_hit_effect(
             self.player.rect.centerx, self.player.rect.centery)
-        self.particle_systems.append(hit_effect)
+        self.particles.spawn(hit_effect, "hit")
 
         # Вспышка экрана
         self.flash_color = RED
@@ -297,79 +542,69 @@ class Game:
         audio_manager.play_sound("win")
 
         # Эффект завершения уровня
+        rng = rng_streams.get("game")
         for _ in range(5):
-            x = random.randint(100, WIDTH - 100)
-            y = random.randint(100, HEIGHT - 100)
+            x = rng.randint(100, WIDTH - 100)
+            y = rng.randint(100, HEIGHT - 100)
             effect = ParticleSystem()
             effect.emit_circle(x, y, count=20, color=GREEN, speed=3, lifetime=60)
-            self.particle_systems.append(effect)
+            self.particles.spawn(effect, "level_complete")
 
         # Сохраняем прогресс
         self.save_progress()
 
     def draw(self):
         """Отрисовка игры"""
-        # Получаем цвет фона
-        bg_color = get_background_color(self.level_data["background"])
-
-        # Применяем тряску экрана
-        shake_x = random.randint(-self.screen_shake, self.screen_shake) if self.screen_shake > 0 else 0
-        shake_y = random.randint(-self.screen_shake, self.screen_shake) if self.screen_shake > 0 else 0
-
-        # Очищаем экран
-        self.screen.fill(bg_color)
+        if self.headless:
+            return
 
-        # Облака (только для небесного фона) - рисуем ПЕРЕД UI
-        if self.level_data["background"] == "sky":
-            for i in range(3):
-                x = (pygame.time.get_ticks() // 50 + i * 300) % (WIDTH + 200) - 100
-                x += shake_x * 0.5
+        self.render_targets.begin_frame()
 
-                # Рисуем облака на отдельной поверхности с прозрачностью
-                cloud_surface = pygame.Surface((100, 60), pygame.SRCALPHA)
-                pygame.draw.circle(cloud_surface, (255, 255, 255, 180), (25, 30), 25)
-                pygame.draw.circle(cloud_surface, (255, 255, 255, 180), (50, 20), 20)
-                pygame.draw.circle(cloud_surface, (255, 255, 255, 180), (0, 20), 20)
-                self.screen.blit(cloud_surface, (int(x) - 50, 50 + shake_y * 0.5))
+        if self.dirty_renderer is not None and self.can_draw_dirty():
+            self.draw_dirty()
+        else:
+            self.draw_full()
 
-        # Создаем поверхность для игрового мира (для применения тряски)
-        game_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+    def can_draw_dirty(self):
+        """Можно ли перерисовать только изменившиеся области"""
+        # Тряска, вспышка и затемняющие экраны меняют весь кадр,
+        # профилировщик тоже рисуется только при полной отрисовке
+        return not (self.dirty_renderer.needs_full or profiler.enabled or
+                    self.screen_shake > 0 or
+                    (self.flash_alpha > 0 and self.flash_color) or
+                    self.game_paused or self.level_complete or self.game_over)
 
-        # Отрисовка пуль стреляющих врагов
-        for enemy in self.enemies:
-            if enemy.enemy_type == "shooter":
-                enemy.draw_bullets(game_surface)
+    def draw_full(self):
+        """Полная отрисовка кадра"""
+        # Применяем тряску экрана (свой поток - отрисовка не влияет на симуляцию)
+        rng = rng_streams.get("shake")
+        shake_x = rng.randint(-self.screen_shake, self.screen_shake) if self.screen_shake > 0 else 0
+        shake_y = rng.randint(-self.screen_shake, self.screen_shake) if self.screen_shake > 0 else 0
 
-        # Все спрайты на игровую поверхность
-        self.all_sprites.draw(game_surface)
+        # Фон с параллаксом (дальние слои трясутся слабее)
+        self.background.update(pygame.time.get_ticks(), shake_x, shake_y)
+        self.background.draw(self.screen)
 
-        # Частицы на игровую поверхность
-        for particle_system in self.particle_systems:
-            particle_system.draw(game_surface)
+        # Статичные платформы одним blit (трясутся вместе с миром)
+        self.screen.blit(self.level_layer, (shake_x, shake_y))
+        profiler.mark("draw.background")
 
-        # Применяем тряску к игровой поверхности
-        self.screen.blit(game_surface, (shake_x, shake_y))
+        # Игровой мир рисуется прямо на экран со сдвигом тряски
+        self.draw_world(self.screen, (shake_x, shake_y))
 
         # UI элементы (не трясутся) - рисуем ПОСЛЕ всего
         self.draw_ui()
+        profiler.mark("draw.hud")
 
         # Эффект вспышки
         if self.flash_alpha > 0 and self.flash_color:
-            flash_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            flash_surface.fill((*self.flash_color[:3], self.flash_alpha))
+            flash_surface = self.render_targets.get(("flash", tuple(self.flash_color[:3])),
+                                                    (WIDTH, HEIGHT), fill=self.flash_color[:3])
+            flash_surface.set_alpha(self.flash_alpha)
             self.screen.blit(flash_surface, (0, 0))
 
         # Эффект неуязвимости (мигание игрока)
-        if self.invincibility_timer > 0:
-            if (self.invincibility_timer // 3) % 2 == 0:
-                # Создаем копию игрока с прозрачностью
-                player_mask = pygame.mask.from_surface(self.player.image)
-                player_outline = player_mask.to_surface(setcolor=WHITE, unsetcolor=None)
-                player_outline.set_alpha(150)
-
-                # Рисуем контур
-                outline_pos = (self.player.rect.x + shake_x, self.player.rect.y + shake_y)
-                self.screen.blit(player_outline, outline_pos)
+        self.draw_invincibility(shake_x, shake_y)
 
         # Экран паузы
         if self.game_paused:
@@ -382,75 +617,148 @@ class Game:
         # Экран Game Over
         if self.game_over:
             self.draw_game_over_screen()
+        profiler.mark("draw.overlays")
+
+        profiler.draw(self.screen, 1000 / self.render_rate)
+        profiler.mark("draw.profiler")
 
         pygame.display.flip()
+        profiler.mark("flip")
+
+        if self.dirty_renderer is not None:
+            clean = not (shake_x or shake_y or self.screen_shake > 0 or
+                         (self.flash_alpha > 0 and self.flash_color) or
+                         self.game_paused or self.level_complete or self.game_over)
+            self.dirty_renderer.record_full(self.dynamic_rects(), clean=clean)
+
+    def draw_dirty(self):
+        """Отрисовка только областей, где что-то изменилось"""
+        # Интерфейс обновляем заранее, чтобы знать его изменившиеся области
+        self.hud.update()
+        profiler.mark("draw.hud")
+
+        # Сдвинувшиеся слои фона тоже нужно перерисовать
+        background_rects = self.background.update(pygame.time.get_ticks())
+
+        current = self.dynamic_rects()
+        regions = self.dirty_renderer.regions(current, self.hud.dirty_rects + background_rects)
+
+        # Восстанавливаем фон и статичные платформы в грязных областях
+        for rect in regions:
+            self.screen.set_clip(rect)
+            self.background.draw(self.screen)
+            self.screen.blit(self.level_layer, rect, rect)
+        self.screen.set_clip(None)
+        profiler.mark("draw.background")
+
+        # Динамические объекты рисуются прямо на экран: все они
+        # лежат внутри восстановленных областей
+        self.draw_world(self.screen)
+
+        # Интерфейс поверх - только в перерисованных областях
+        for rect in regions:
+            self.screen.blit(self.hud.layer, rect, rect)
+        profiler.mark("draw.hud")
+
+        self.draw_invincibility()
+        profiler.mark("draw.overlays")
+
+        pygame.display.update(regions)
+        profiler.mark("flip")
+        self.dirty_renderer.record_dirty(current, regions)
+
+    def draw_world(self, surface, offset=(0, 0)):
+        """Пули, движущиеся спрайты и частицы"""
+        # Отрисовка пуль стреляющих врагов
+        for enemy in self.enemies:
+            if enemy.enemy_type == "shooter":
+                enemy.draw_bullets(surface, offset)
+
+        # Движущиеся спрайты
+        if offset == (0, 0):
+            self.dynamic_sprites.draw(surface)
+        else:
+            surface.blits([(sprite.image, sprite.rect.move(offset))
+                           for sprite in self.dynamic_sprites], doreturn=False)
+        profiler.mark("draw.sprites")
+
+        # Частицы
+        self.particles.draw(surface, offset)
+        profiler.mark("draw.particles")
+
+    def draw_invincibility(self, shake_x=0, shake_y=0):
+        """Эффект неуязвимости (мигание игрока)"""
+        if self.invincibility_timer > 0:
+            if (self.invincibility_timer // 3) % 2 == 0:
+                # Контур кадра игрока строится один раз на кадр анимации
+                image = self.player.image
+                player_outline = self.render_targets.cached(
+                    ("outline", image), lambda: create_outline_surface(image))
 
-    def draw_ui(self):
-        """Отрисовка интерфейса"""
-        # Счёт
-        score_text = render_text(f"Очки: {self.score}", size="medium", color=WHITE)
-        self.screen.blit(score_text, (10, 10))
+                # Рисуем контур
+                outline_pos = (self.player.rect.x + shake_x, self.player.rect.y + shake_y)
+                self.screen.blit(player_outline, outline_pos)
 
-        # Уровень
-        level_text = render_text(f"Уровень: {self.current_level}", size="medium", color=WHITE)
-        self.screen.blit(level_text, (10, 50))
+    def render_stats(self):
+        """Сколько поверхностей создано при отрисовке последнего кадра"""
+        return {
+            "surface_allocations": self.render_targets.frame_allocations,
+            "total_surface_allocations": self.render_targets.allocations,
+            "hud_renders": self.hud.last_renders if self.hud is not None else 0,
+        }
 
-        # Название уровня
-        name_text = render_text(self.level_data["name"], size="small", color=WHITE)
-        self.screen.blit(name_text, (WIDTH // 2 - name_text.get_width() // 2, 10))
+    def dynamic_rects(self):
+        """Области экрана, занятые динамическими объектами в этом кадре"""
+        rects = [sprite.rect for sprite in self.dynamic_sprites]
 
-        # Требуемые очки
-        req_text = render_text(f"Нужно очков: {self.level_data['required_score']}",
-                               size="small", color=WHITE)
-        self.screen.blit(req_text, (WIDTH // 2 - req_text.get_width() // 2, 40))
+        for enemy in self.enemies:
+            if enemy.enemy_type == "shooter":
+                rects.extend(bullet.rect for bullet in enemy.bullets)
 
-        # Оставшиеся монеты
-        coins_left = len(self.coins)
-        coins_text = render_text(f"Монеты: {coins_left}", size="small", color=WHITE)
-        self.screen.blit(coins_text, (WIDTH // 2 - coins_text.get_width() // 2, 70))
+        particle_bounds = self.particles.bounds()
+        if particle_bounds is not None:
+            rects.append(particle_bounds)
 
-        # Время уровня
-        seconds = self.level_time // 60
-        minutes = seconds // 60
-        seconds = seconds % 60
-        time_str = f"{minutes:02d}:{seconds:02d}"
-        time_text = render_text(f"Время: {time_str}", size="small", color=WHITE)
-        self.screen.blit(time_text, (WIDTH - 150, 10))
-
-        # Жизни - текст
-        lives_text = render_text(f"Жизни:", size="medium", color=WHITE)
-        self.screen.blit(lives_text, (WIDTH - 150, 50))
-
-        # Визуализация сердечками
-        for i in range(min(self.player_lives, 5)):  # Максимум 5 сердечек в строку
-            x = WIDTH - 150 + 70 + i * 35
-            y = 50
-
-            # Рисуем сердечко
-            # Левый круг
-            pygame.draw.circle(self.screen, RED, (x + 8, y + 8), 8)
-            # Правый круг
-            pygame.draw.circle(self.screen, RED, (x + 22, y + 8), 8)
-            # Треугольник снизу
-            pygame.draw.polygon(self.screen, RED, [
-                (x, y + 15),
-                (x + 15, y + 25),
-                (x + 30, y + 15)
-            ])
-
-            # Контур сердечка
-            pygame.draw.circle(self.screen, (200, 0, 0), (x + 8, y + 8), 8, 1)
-            pygame.draw.circle(self.screen, (200, 0, 0), (x + 22, y + 8), 8, 1)
-            pygame.draw.polygon(self.screen, (200, 0, 0), [
-                (x, y + 15),
-                (x + 15, y + 25),
-                (x + 30, y + 15)
-            ], 1)
+        return rects
+
+    def create_hud(self):
+        """Создание виджетов интерфейса"""
+        hud = Hud()
+
+        def text(template, size="small", color=WHITE):
+            atlas = glyph_atlases.get(size, color)
+            return lambda value: atlas.render(template.format(value))
+
+        def static(surface):
+            return lambda value: surface
+
+        # Счёт и уровень
+        hud.add(HudWidget(lambda: self.score, text("Очки: {}", "medium"), (10, 10)))
+        hud.add(HudWidget(lambda: self.current_level, text("Уровень: {}", "medium"), (10, 50)))
+
+        # Название уровня, требуемые очки и оставшиеся монеты
+        hud.add(HudWidget(lambda: self.level_data["name"], text("{}"),
+                          (WIDTH // 2, 10), anchor="midtop"))
+        hud.add(HudWidget(lambda: self.level_data["required_score"], text("Нужно очков: {}"),
+                          (WIDTH // 2, 40), anchor="midtop"))
+        hud.add(HudWidget(lambda: len(self.coins), text("Монеты: {}"),
+                          (WIDTH // 2, 70), anchor="midtop"))
+
+        # Время уровня (перерисовка раз в секунду)
+        hud.add(HudWidget(lambda: self.level_time // 60, self.render_time_widget,
+                          (WIDTH - 150, 10)))
+
+        # Жизни - текст и сердечки (максимум 5 в строку)
+        hud.add(HudWidget(lambda: None, static(render_text("Жизни:", size="medium", color=WHITE)),
+                          (WIDTH - 150, 50)))
+        hud.add(HudWidget(lambda: min(self.player_lives, 5), render_hearts,
+                          (WIDTH - 150 + 70, 50)))
 
         # Если жизней больше 5, показываем число
-        if self.player_lives > 5:
-            extra_text = render_text(f"+{self.player_lives - 5}", size="small", color=RED)
-            self.screen.blit(extra_text, (WIDTH - 150 + 70 + 5 * 35, 50))
+        extra_atlas = glyph_atlases.get("small", RED)
+        hud.add(HudWidget(lambda: max(self.player_lives - 5, 0),
+                          lambda extra: extra_atlas.render(f"+{extra}") if extra else None,
+                          (WIDTH - 150 + 70 + 5 * 35, 50)))
 
         # Инструкции в правом нижнем углу
         controls = [
@@ -460,55 +768,103 @@ class Game:
             "ESC - пауза",
             "R - рестарт уровня",
             "M - в меню",
-            "P - тест эффектов"
+            "P - тест эффектов",
+            "F3 - профилировщик"
         ]
-
-        y_offset = HEIGHT - 200
-        for i, text in enumerate(controls):
-            control_text = render_text(text, size="small", color=WHITE)
-            self.screen.blit(control_text, (WIDTH - 220, y_offset + i * 25))
+        hud.add(HudWidget(lambda: None, static(render_lines(controls)),
+                          (WIDTH - 220, HEIGHT - 225)))
 
         # Индикатор неуязвимости (если активен)
-        if self.invincibility_timer > 0:
-            # Прогресс-бар неуязвимости
-            bar_width = 100
-            bar_height = 10
-            bar_x = WIDTH - 150
-            bar_y = 90
-
-            # Фон прогресс-бара
-            pygame.draw.rect(self.screen, (100, 100, 100),
-                             (bar_x, bar_y, bar_width, bar_height))
-
-            # Заполнение прогресс-бара
-            progress = self.invincibility_timer / 90.0  # 90 кадров = 1.5 секунды
-            fill_width = int(bar_width * progress)
-            pygame.draw.rect(self.screen, (255, 255, 0),
-                             (bar_x, bar_y, fill_width, bar_height))
-
-            # Текст "Неуязвимость"
-            inv_text = render_text("Неуязвимость", size="small", color=(255, 255, 0))
-            self.screen.blit(inv_text, (bar_x, bar_y - 20))
+        hud.add(HudWidget(self.invincibility_bar_value, self.render_invincibility_widget,
+                          (WIDTH - 150, 70)))
 
         # FPS счетчик (если включен в настройках)
-        try:
-            with open("settings.txt", "r") as f:
-                for line in f:
-                    if line.startswith("show_fps="):
-                        if line.split("=")[1].strip() == "1":
-                            fps_text = render_text(f"FPS: {int(self.clock.get_fps())}",
-                                                   size="small", color=(200, 200, 200))
-                            self.screen.blit(fps_text, (10, HEIGHT - 30))
-                        break
-        except:
-            pass
+        fps_atlas = glyph_atlases.get("small", (200, 200, 200))
+        hud.add(HudWidget(lambda: int(self.clock.get_fps()) if self.fps_visible() else None,
+                          lambda fps: fps_atlas.render(f"FPS: {fps}") if fps is not None else None,
+                          (10, HEIGHT - 30)))
+
+        # Статистика частиц (вместе с FPS)
+        hud.add(HudWidget(self.particle_stats_value,
+                          lambda stats: fps_atlas.render("Частицы: {} / сброшено: {}".format(*stats))
+                          if stats is not None else None,
+                          (10, HEIGHT - 50)))
+
+        # Сэкономленная площадь экрана в режиме грязных прямоугольников
+        hud.add(HudWidget(self.dirty_saved_value,
+                          lambda saved: fps_atlas.render(f"Экономия кадра: {saved}%")
+                          if saved is not None else None,
+                          (10, HEIGHT - 70)))
+
+        return hud
+
+    def render_time_widget(self, total_seconds):
+        """Поверхность с временем уровня"""
+        minutes = total_seconds // 60
+        seconds = total_seconds % 60
+        return glyph_atlases.get("small", WHITE).render(f"Время: {minutes:02d}:{seconds:02d}")
+
+    def invincibility_bar_value(self):
+        """Ширина заполнения полосы неуязвимости (None - полоса скрыта)"""
+        if self.invincibility_timer <= 0:
+            return None
+        progress = self.invincibility_timer / 90.0  # 90 кадров = 1.5 секунды
+        return int(100 * progress)
+
+    def render_invincibility_widget(self, fill_width):
+        """Полоса неуязвимости с подписью"""
+        if fill_width is None:
+            return None
+
+        bar_width = 100
+        bar_height = 10
+
+        # Текст "Неуязвимость"
+        inv_text = render_text("Неуязвимость", size="small", color=(255, 255, 0))
+
+        surface = pygame.Surface((max(bar_width, inv_text.get_width()), 20 + bar_height),
+                                 pygame.SRCALPHA)
+        surface.blit(inv_text, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+
+        # Фон и заполнение прогресс-бара
+        pygame.draw.rect(surface, (100, 100, 100), (0, 20, bar_width, bar_height))
+        pygame.draw.rect(surface, (255, 255, 0), (0, 20, fill_width, bar_height))
+
+        return surface
+
+    def particle_stats_value(self):
+        """Живые и отброшенные частицы (None - показ выключен)"""
+        if not self.fps_visible():
+            return None
+        return self.particles.count, self.particles.dropped_count
+
+    def dirty_saved_value(self):
+        """Процент неперерисованной площади (None - показ выключен)"""
+        if self.dirty_renderer is None or not self.fps_visible():
+            return None
+        return int(self.dirty_renderer.last_saved * 100)
+
+    def fps_visible(self):
+        """Включен ли показ FPS в настройках"""
+        return settings_store.show_fps
+
+    @property
+    def render_rate(self):
+        """Частота отрисовки из настроек (30, 60 или 144 кадров в секунду)"""
+        rate = settings_store.render_rate
+        return rate if rate in RENDER_RATES else FPS
+
+    def draw_ui(self):
+        """Отрисовка интерфейса"""
+        # Перерисовываются только изменившиеся виджеты,
+        # на экран интерфейс выводится одним blit
+        self.hud.update()
+        self.hud.draw(self.screen)
 
     def draw_pause_screen(self):
         """Экран паузы"""
         # Затемняем экран
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.render_targets.overlay((0, 0, 0), 180), (0, 0))
 
         # Текст PAUSE
         pause_text = render_text("ПАУЗА", size="title", color=BLUE)
@@ -528,9 +884,7 @@ class Game:
     def draw_level_complete_screen(self):
         """Экран завершения уровня"""
         # Затемняем экран
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.render_targets.overlay((0, 0, 0), 200), (0, 0))
 
         # Текст
         complete_text = render_text("УРОВЕНЬ ПРОЙДЕН!", size="title", color=GREEN)
@@ -562,9 +916,7 @@ class Game:
     def draw_game_over_screen(self):
         """Экран Game Over"""
         # Затемняем экран
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.render_targets.overlay((0, 0, 0), 200), (0, 0))
 
         # Текст Game Over
         game_over_text = render_text("GAME OVER", size="title", color=RED)
@@ -576,21 +928,15 @@ class Game:
         score_text = render_text(f"Финальный счёт: {self.score}", size="large", color=WHITE)
         level_text = render_text(f"Достигнут уровень: {self.current_level}", size="large", color=WHITE)
 
-        # Загружаем рекорд
-        try:
-            with open("highscore.txt", "r") as f:
-                high_score = int(f.read())
-        except:
-            high_score = 0
-
-        high_text = render_text(f"Рекорд: {high_score}", size="large", color=(255, 215, 0))
+        # Рекорд запомнен в момент Game Over - файл здесь не читается
+        high_text = render_text(f"Рекорд: {self.high_score}", size="large", color=(255, 215, 0))
 
         self.screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, HEIGHT // 2 - 50))
         self.screen.blit(level_text, (WIDTH // 2 - level_text.get_width() // 2, HEIGHT // 2))
         self.screen.blit(high_text, (WIDTH // 2 - high_text.get_width() // 2, HEIGHT // 2 + 50))
 
         # Новый рекорд?
-        if self.score > high_score:
+        if self.new_high_score:
             new_record = render_text("НОВЫЙ РЕКОРД!", size="large", color=GREEN)
             self.screen.blit(new_record, (WIDTH // 2 - new_record.get_width() // 2, HEIGHT // 2 + 100))
 
@@ -611,7 +957,7 @@ class Game:
         self.level_data = get_level_data(self.current_level)
 
         # Обновляем заголовок окна
-        pygame.display.set_caption(f"Мой Платформер - Уровень {self.current_level}")
+        self.update_caption()
 
         # Сброс состояния
         self.level_complete = False
@@ -650,7 +996,7 @@ class Game:
         self.game_paused = False
         self.level_data = get_level_data(self.current_level)
 
-        pygame.display.set_caption(f"Мой Платформер - Уровень {self.current_level}")
+        self.update_caption()
 
         # Пересоздаем уровень
         self.create_level()
@@ -658,25 +1004,42 @@ class Game:
         # Звук начала игры
         audio_manager.play_sound("win")
 
+    def update_caption(self):
+        """Номер уровня в заголовке окна"""
+        if not self.headless:
+            pygame.display.set_caption(f"Мой Платформер - Уровень {self.current_level}")
+
     def return_to_menu(self):
         """Возврат в главное меню"""
         audio_manager.stop_music()
         self.quit_game()
 
+    @tracer.traced("save_high_score", "io")
     def save_high_score(self):
-        """Сохранение рекорда в файл"""
+        """Сохранение рекорда в файл; рекорд запоминается для экрана Game Over"""
+        # Прогоны без окна (headless.py, replay.py) не трогают файлы игрока
+        if self.headless:
+            return
+
         try:
             with open("highscore.txt", "r") as f:
                 high_score = int(f.read())
         except:
             high_score = 0
 
-        if self.score > high_score:
+        self.new_high_score = self.score > high_score
+        self.high_score = max(self.score, high_score)
+
+        if self.new_high_score:
             with open("highscore.txt", "w") as f:
                 f.write(str(self.score))
 
+    @tracer.traced("save_progress", "io")
     def save_progress(self):
         """Сохранение прогресса"""
+        if self.headless:
+            return
+
         try:
             # Сохраняем только если прошли уровень
             if self.current_level >= self.unlocked_levels:
@@ -696,6 +1059,7 @@ class Game:
             return 1
 
     @unlocked_levels.setter
+    @tracer.traced("save_unlocked_levels", "io")
     def unlocked_levels(self, value):
         """Установка количества открытых уровней"""
         try:
@@ -706,27 +1070,61 @@ class Game:
 
     def create_test_effect(self):
         """Тестовый эффект (для отладки)"""
-        x = random.randint(100, WIDTH - 100)
-        y = random.randint(100, HEIGHT - 100)
+        rng = rng_streams.get("game")
+        x = rng.randint(100, WIDTH - 100)
+        y = rng.randint(100, HEIGHT - 100)
 
         effect = ParticleSystem()
         effect.emit_circle(x, y, count=30,
-                           color=random.choice([BLUE, GREEN, RED, (255, 215, 0)]),
-                           speed=random.uniform(2, 5),
-                           lifetime=random.randint(40, 80))
-        self.particle_systems.append(effect)
+                           color=rng.choice([BLUE, GREEN, RED, (255, 215, 0)]),
+                           speed=rng.uniform(2, 5),
+                           lifetime=rng.randint(40, 80))
+        self.particles.spawn(effect, "test")
 
     def quit_game(self):
         """Выход из игры"""
+        self.stop_recording()
         audio_manager.stop_music()
         pygame.quit()
         sys.exit()
 
     def run(self):
-        """Главный игровой цикл"""
+        """Главный игровой цикл
+
+        Симуляция идет шагами фиксированной длины (SIMULATION_RATE в
+        секунду), сколько бы кадров ни рисовалось. Накопившееся время
+        догоняется не больше чем MAX_CATCHUP_STEPS шагами за кадр,
+        остаток между шагами сглаживается интерполяцией положений.
+        """
+        step_ms = 1000 / SIMULATION_RATE
+        accumulator = 0.0
+        self.clock.tick()
+
         running = True
         while running:
-            self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
\ No newline at end of file
+            accumulator += self.clock.tick(self.render_rate)
+            profiler.begin_frame()
+            tracer.begin("frame", "run")
+
+            with tracer.span("handle_events", "run"):
+                self.handle_events()
+            profiler.mark("events")
+
+            steps = 0
+            with tracer.span("update", "run"):
+                while accumulator >= step_ms and steps < MAX_CATCHUP_STEPS:
+                    self.step()
+                    accumulator -= step_ms
+                    steps += 1
+
+            # Не успеваем - лишнее время отбрасываем, чтобы не копить отставание
+            if accumulator >= step_ms:
+                accumulator %= step_ms
+            profiler.mark("update.other")
+
+            with tracer.span("draw", "run"):
+                restore = self.apply_interpolation(accumulator / step_ms)
+                self.draw()
+                self.restore_positions(restore)
+            profiler.end_frame()
+            tracer.end("frame", "run")
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""
+headless.py - Запуск симуляции без окна (для прогонов уровней и нагрузочных тестов)
+
+Примеры:
+    python headless.py --level 2 --frames 10000 --input random --seed 1
+    python headless.py --level 1 --input script --script run.txt
+    python headless.py --level 3 --record session.rec  # для replay.py
+
+Скрипт ввода - строки "кадр действия", например "30 right jump".
+Удерживаемые действия (left, right) действуют до следующей строки,
+нажатия (jump, restart, next, ...) срабатывают один раз в своем кадре.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Без окна и звуковой карты
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import controls
+from levels import LEVELS
+from settings import SIMULATION_RATE
+from tracing import start_tracing, tracer
+
+
+def load_script(filename):
+    """Скрипт ввода: список (кадр, маска), отсортированный по кадрам"""
+    script = []
+    with open(filename, "r") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            frame, _, actions = line.partition(" ")
+            try:
+                script.append((int(frame), controls.parse_actions(actions)))
+            except ValueError as e:
+                raise ValueError(f"{filename}:{line_number}: {e}")
+    script.sort(key=lambda entry: entry[0])
+    return script
+
+
+def script_input(script):
+    """Ввод по скрипту"""
+    entries = dict(script)
+    held = 0
+
+    def next_actions(frame, game):
+        nonlocal held
+        actions = entries.get(frame)
+        if actions is None:
+            return held
+        held = actions & ~controls.PRESS_ACTIONS
+        return actions
+
+    return next_actions
+
+
+def random_input(seed, hold_frames=30, jump_chance=0.05):
+    """Случайный ввод: направление меняется раз в hold_frames кадров
+
+    После конца уровня или проигрыша нажимается "дальше".
+    """
+    rng = random.Random(seed)
+    directions = (0, controls.LEFT, controls.RIGHT, controls.RIGHT)
+    held = 0
+
+    def next_actions(frame, game):
+        nonlocal held
+        if game.game_over or game.level_complete:
+            return controls.NEXT
+
+        if frame % hold_frames == 0:
+            held = rng.choice(directions)
+        actions = held
+        if rng.random() < jump_chance:
+            actions |= controls.JUMP
+        return actions
+
+    return next_actions
+
+
+def run(game, frames, next_actions):
+    """Прогон frames шагов симуляции; возвращает статистику"""
+    completed = 0
+    game_overs = 0
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        game.apply_input(next_actions(frame, game))
+
+        was_complete, was_over = game.level_complete, game.game_over
+        with tracer.span("step", "run"):
+            game.step()
+        completed += game.level_complete and not was_complete
+        game_overs += game.game_over and not was_over
+    elapsed = time.perf_counter() - start
+
+    return {
+        "frames": frames,
+        "seconds": elapsed,
+        "fps": frames / elapsed if elapsed > 0 else float("inf"),
+        "levels_completed": completed,
+        "game_overs": game_overs,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Симуляция игры без окна")
+    parser.add_argument("--level", type=int, default=1, choices=sorted(LEVELS),
+                        help="номер уровня из levels.LEVELS")
+    parser.add_argument("--frames", type=int, default=3600,
+                        help="сколько шагов симуляции прогнать")
+    parser.add_argument("--input", choices=("random", "script", "none"), default="random",
+                        help="источник ввода")
+    parser.add_argument("--script", help="файл скрипта ввода (для --input script)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="зерно случайного ввода и эффектов")
+    parser.add_argument("--record", help="записать ввод в файл для replay.py")
+    parser.add_argument("--trace", help="записать трассу Chrome trace-event в файл")
+    args = parser.parse_args(argv)
+
+    if args.input == "script" and not args.script:
+        parser.error("--input script требует --script ФАЙЛ")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    start_tracing(args.trace)
+
+    pygame.init()
+    pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+
+    if args.input == "script":
+        try:
+            next_actions = script_input(load_script(args.script))
+        except (OSError, ValueError) as e:
+            print(f"Не удалось загрузить скрипт: {e}")
+            return 1
+    elif args.input == "random":
+        next_actions = random_input(args.seed)
+    else:
+        next_actions = lambda frame, game: 0
+
+    from game import Game
+    game = Game(start_level=args.level, headless=True, seed=args.seed, record=args.record)
+    stats = run(game, args.frames, next_actions)
+    if game.recorder is not None:
+        game.stop_recording()
+
+    print(f"Уровень {args.level}: {stats['frames']} кадров за {stats['seconds']:.2f} с")
+    print(f"Скорость симуляции: {stats['fps']:.0f} кадров/с "
+          f"(x{stats['fps'] / SIMULATION_RATE:.1f} от реального времени)")
+    print(f"Очки: {game.score}, жизни: {game.player_lives}, "
+          f"уровней пройдено: {stats['levels_completed']}, проигрышей: {stats['game_overs']}")
+
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
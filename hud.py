@@ -0,0 +1,141 @@
+"""
+hud.py - Интерфейс поверх игры с перерисовкой только изменившихся элементов
+"""
+import pygame
+from settings import *
+from fonts import render_text
+
+
+def draw_heart(surface, x, y):
+    """Рисование сердечка (30x26) с левым верхним углом в (x, y)"""
+    # Левый круг
+    pygame.draw.circle(surface, RED, (x + 8, y + 8), 8)
+    # Правый круг
+    pygame.draw.circle(surface, RED, (x + 22, y + 8), 8)
+    # Треугольник снизу
+    pygame.draw.polygon(surface, RED, [
+        (x, y + 15),
+        (x + 15, y + 25),
+        (x + 30, y + 15)
+    ])
+
+    # Контур сердечка
+    pygame.draw.circle(surface, (200, 0, 0), (x + 8, y + 8), 8, 1)
+    pygame.draw.circle(surface, (200, 0, 0), (x + 22, y + 8), 8, 1)
+    pygame.draw.polygon(surface, (200, 0, 0), [
+        (x, y + 15),
+        (x + 15, y + 25),
+        (x + 30, y + 15)
+    ], 1)
+
+
+def render_hearts(count, spacing=35):
+    """Поверхность с рядом сердечек"""
+    if count <= 0:
+        return None
+
+    surface = pygame.Surface((spacing * (count - 1) + 31, 26), pygame.SRCALPHA)
+    for i in range(count):
+        draw_heart(surface, i * spacing, 0)
+    return surface
+
+
+def render_lines(lines, size="small", color=WHITE, spacing=25):
+    """Поверхность с несколькими строками текста"""
+    rendered = [render_text(line, size=size, color=color) for line in lines]
+    width = max(text.get_width() for text in rendered)
+    height = spacing * (len(rendered) - 1) + rendered[-1].get_height()
+
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    for i, text in enumerate(rendered):
+        surface.blit(text, (0, i * spacing), special_flags=pygame.BLEND_RGBA_MAX)
+    return surface
+
+
+class HudWidget:
+    """Элемент интерфейса с заранее отрисованной поверхностью
+
+    value_func возвращает значение, от которого зависит картинка,
+    render_func превращает его в поверхность (или None - элемент скрыт).
+    Перерисовка происходит только когда значение изменилось.
+    """
+
+    def __init__(self, value_func, render_func, pos, anchor="topleft"):
+        self.value_func = value_func
+        self.render_func = render_func
+        self.pos = pos
+        self.anchor = anchor
+
+        self.value = None
+        self.surface = None
+        self.rect = None
+        self.initialized = False
+
+    def refresh(self):
+        """Проверка значения; возвращает (старый rect, новый rect) при изменении"""
+        value = self.value_func()
+        if self.initialized and value == self.value:
+            return None
+
+        self.initialized = True
+        self.value = value
+        old_rect = self.rect
+
+        self.surface = self.render_func(value)
+        if self.surface is not None:
+            self.rect = self.surface.get_rect(**{self.anchor: self.pos})
+        else:
+            self.rect = None
+
+        return old_rect, self.rect
+
+
+class Hud:
+    """Слой интерфейса, собранный из виджетов в одну поверхность"""
+
+    def __init__(self, size=(WIDTH, HEIGHT)):
+        self.layer = pygame.Surface(size, pygame.SRCALPHA)
+        self.widgets = []
+
+        # Области слоя, изменившиеся при последнем обновлении
+        self.dirty_rects = []
+        self.last_renders = 0
+
+    def add(self, widget):
+        """Добавление виджета"""
+        self.widgets.append(widget)
+        return widget
+
+    def invalidate(self):
+        """Принудительная перерисовка всех виджетов"""
+        for widget in self.widgets:
+            widget.initialized = False
+
+    def update(self):
+        """Перерисовка изменившихся виджетов на слое"""
+        changed = []
+        renders = 0
+        for widget in self.widgets:
+            result = widget.refresh()
+            if result:
+                renders += 1
+                changed.extend(rect for rect in result if rect)
+
+        self.dirty_rects = changed
+        self.last_renders = renders
+        if not changed:
+            return changed
+
+        # Пересобираем слой из готовых поверхностей (без рендера текста).
+        # Виджеты могут пересекаться (подпись "Жизни:" и сердечки, полоса
+        # неуязвимости), поэтому обычное наложение по альфе в порядке добавления
+        self.layer.fill((0, 0, 0, 0))
+        self.layer.blits([(widget.surface, widget.rect)
+                          for widget in self.widgets if widget.surface is not None],
+                         doreturn=False)
+
+        return changed
+
+    def draw(self, screen):
+        """Вывод всего интерфейса одним blit"""
+        screen.blit(self.layer, (0, 0))
@@ -3,11 +3,30 @@ main.py - Главный файл игры
 """
 import pygame
 import sys
+import time
+import argparse
 
 # Настройки экрана (добавляем здесь)
 WIDTH, HEIGHT = 800, 600
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Мой Платформер")
+    parser.add_argument("--seed", type=int, help="зерно генераторов случайных чисел")
+    parser.add_argument("--record", help="записать ввод в файл для replay.py")
+    parser.add_argument("--trace", help="записать трассу Chrome trace-event в файл "
+                                        "(или переменная окружения PLATFORMER_TRACE)")
+    return parser.parse_args(argv)
+
 def main():
+    # Отсчет времени до первого кадра
+    started = time.perf_counter()
+
+    args = parse_args()
+
+    # Трасса включается до всего остального, чтобы попала и загрузка
+    from tracing import start_tracing
+    start_tracing(args.trace)
+
     # Инициализация Pygame
     pygame.init()
     pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
@@ -19,25 +38,30 @@ def main():
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Мой Платформер")
 
-    # Инициализируем аудио
+    # Настройки читаются с диска один раз
+    from settings_store import settings_store
+    settings_store.load()
+
+    # Звуки и музыка готовятся в фоне, меню рисуется сразу
     from audio import audio_manager
-    audio_manager.initialize()
+    audio_manager.start_warmup()
 
     # Простое меню
-    menu_result = run_simple_menu(screen)
+    menu_result = run_simple_menu(screen, started)
 
     if menu_result == "play":
         # Запускаем игру
         from game import Game
-        game = Game(start_level=1)
+        game = Game(start_level=1, seed=args.seed, record=args.record)
         game.run()
     elif menu_result == "exit":
         pygame.quit()
         sys.exit()
 
-def run_simple_menu(screen):
+def run_simple_menu(screen, started=None):
     """Простое меню без сложной логики"""
     from fonts import render_text
+    from tracing import tracer
 
     # Цвета
     WHITE = (255, 255, 255)
@@ -52,7 +76,7 @@ def run_simple_menu(screen):
 
     clock = pygame.time.Clock()
 
-    # Запускаем музыку
+    # Запускаем музыку (начнется, когда будет готов буфер)
     from audio import audio_manager
     audio_manager.play_music()
 
@@ -106,6 +130,13 @@ def run_simple_menu(screen):
         screen.blit(inst, (WIDTH // 2 - inst.get_width() // 2, HEIGHT - 50))
 
         pygame.display.flip()
+
+        # Время до первого кадра (от запуска main) - отметка в трассе (--trace)
+        if started is not None:
+            elapsed = (time.perf_counter() - started) * 1000
+            tracer.instant("first_frame", "startup", {"ms": round(elapsed, 1)})
+            started = None
+
         clock.tick(60)
 
 if __name__ == "__main__":
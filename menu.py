@@ -1,7 +1,9 @@
 import sys
-import random
+import numpy as np
 from settings import *
 from fonts import render_text
+from settings_store import settings_store
+from particles import particle_sprites
 import pygame
 
 
@@ -33,6 +35,80 @@ class Button:
         return self.rect.collidepoint(pos) and click
 
 
+class MenuBackground:
+    """Фон меню: градиент и падающие частицы
+
+    Градиент рисуется один раз на разрешение, частицы хранятся
+    массивами NumPy и выводятся одним вызовом Surface.blits.
+    """
+
+    PARTICLE_COLORS = np.array([BLUE, GREEN, (255, 215, 0)], dtype=np.int64)
+
+    def __init__(self, size=(WIDTH, HEIGHT), count=50):
+        self.width, self.height = size
+        self.gradient = get_menu_gradient(size)
+        self.rng = np.random.default_rng()
+
+        # Частицы
+        self.x = self.rng.integers(0, self.width + 1, count)
+        self.y = self.rng.integers(0, self.height + 1, count).astype(float)
+        self.speed = self.rng.uniform(0.1, 0.5, count)
+        sizes = self.rng.integers(1, 4, count)
+        colors = self.PARTICLE_COLORS[self.rng.integers(0, len(self.PARTICLE_COLORS), count)]
+
+        # Картинки частиц берутся из общего кэша частиц
+        self.keys = particle_sprites.make_keys(colors, sizes, np.full(count, 255)).tolist()
+        self.sizes = sizes
+
+    def update(self):
+        """Падение частиц; упавшие возвращаются наверх в случайном месте"""
+        self.y += self.speed
+        fallen = self.y > self.height
+        if fallen.any():
+            self.y[fallen] = 0
+            self.x[fallen] = self.rng.integers(0, self.width + 1, int(fallen.sum()))
+
+    def draw(self, screen):
+        """Отрисовка фона"""
+        screen.blit(self.gradient, (0, 0))
+
+        get = particle_sprites.get
+        xs = (self.x - self.sizes).tolist()
+        ys = (self.y.astype(int) - self.sizes).tolist()
+        screen.blits([(get(key), (x, y)) for key, x, y in zip(self.keys, xs, ys)],
+                     doreturn=False)
+
+
+# Градиенты по разрешению и общие фоны меню
+menu_gradients = {}
+menu_backgrounds = {}
+
+
+def get_menu_gradient(size):
+    """Градиент фона меню (рисуется один раз на разрешение)"""
+    gradient = menu_gradients.get(size)
+    if gradient is None:
+        width, height = size
+        gradient = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            gradient = gradient.convert()
+        for y in range(height):
+            color_value = int(10 + (y / height) * 50)
+            color = (color_value, color_value, color_value + 50)
+            pygame.draw.line(gradient, color, (0, y), (width, y))
+        menu_gradients[size] = gradient
+    return gradient
+
+
+def get_menu_background(size=(WIDTH, HEIGHT)):
+    """Общий фон для всех меню (частицы не сбрасываются при переходах)"""
+    background = menu_backgrounds.get(size)
+    if background is None:
+        background = MenuBackground(size)
+        menu_backgrounds[size] = background
+    return background
+
+
 class MainMenu:
     """Главное меню"""
 
@@ -57,44 +133,18 @@ class MainMenu:
         self.bg_offset = 0
 
         # Анимация частиц для фона
-        self.particles = []
-        self.create_background_particles()
-
-    def create_background_particles(self):
-        """Создание частиц для фона меню"""
-        for _ in range(50):
-            self.particles.append({
-                'x': random.randint(0, WIDTH),
-                'y': random.randint(0, HEIGHT),
-                'size': random.randint(1, 3),
-                'speed': random.uniform(0.1, 0.5),
-                'color': random.choice([BLUE, GREEN, (255, 215, 0)])
-            })
+        self.background = get_menu_background(self.screen.get_size())
 
     def update_background(self):
         """Обновление фона с частицами"""
-        for p in self.particles:
-            p['y'] += p['speed']
-            if p['y'] > HEIGHT:
-                p['y'] = 0
-                p['x'] = random.randint(0, WIDTH)
+        self.background.update()
 
     def draw_background(self):
         """Отрисовка фона"""
-        # Градиент
-        for y in range(HEIGHT):
-            color_value = int(10 + (y / HEIGHT) * 50)
-            color = (color_value, color_value, color_value + 50)
-            pygame.draw.line(self.screen, color, (0, y), (WIDTH, y))
-
-        # Частицы
-        for p in self.particles:
-            pygame.draw.circle(self.screen, p['color'],
-                               (int(p['x']), int(p['y'])), p['size'])
+        self.background.draw(self.screen)
 
     def draw(self):
         """Отрисовка меню"""
-        self.screen.fill((0, 0, 0))
         self.draw_background()
 
         # Заголовок с тенью
@@ -194,6 +244,9 @@ class LevelSelectMenu:
         # Названия уровней
         self.level_names = ["Начальный уровень", "Лесная зона", "Опасная территория"]
 
+        # Общий с главным меню фон
+        self.background = get_menu_background(self.screen.get_size())
+
     def load_progress(self):
         """Загрузка прогресса из файла"""
         try:
@@ -204,7 +257,7 @@ class LevelSelectMenu:
 
     def draw(self):
         """Отрисовка меню выбора уровня"""
-        self.screen.fill((0, 0, 30))
+        self.background.draw(self.screen)
 
         # Заголовок
         title_text = render_text("ВЫБОР УРОВНЯ", size="title", color=BLUE)
@@ -285,6 +338,7 @@ class LevelSelectMenu:
             if self.back_button.is_clicked(mouse_pos, mouse_click):
                 return None
 
+            self.background.update()
             self.draw()
             self.clock.tick(60)
 
@@ -299,6 +353,7 @@ class SettingsMenu:
         # Настройки
         self.volume = 0.7
         self.show_fps = True
+        self.render_rate = FPS
 
         # Слайдер громкости
         self.volume_slider = {
@@ -313,13 +368,22 @@ class SettingsMenu:
             'checked': self.show_fps
         }
 
+        # Переключатель частоты кадров
+        self.render_rate_button = Button(WIDTH // 2 + 20, 335, 130, 40, f"{self.render_rate} Гц")
+
         # Кнопки
-        self.apply_button = Button(WIDTH // 2 - 100, 350, 200, 50, "ПРИМЕНИТЬ", GREEN)
-        self.back_button = Button(WIDTH // 2 - 100, 420, 200, 50, "НАЗАД")
+        self.apply_button = Button(WIDTH // 2 - 100, 410, 200, 50, "ПРИМЕНИТЬ", GREEN)
+        self.back_button = Button(WIDTH // 2 - 100, 480, 200, 50, "НАЗАД")
+
+        # Текущие значения из хранилища настроек
+        self.load_settings()
+
+        # Общий с главным меню фон
+        self.background = get_menu_background(self.screen.get_size())
 
     def draw(self):
         """Отрисовка меню настроек"""
-        self.screen.fill((0, 0, 30))
+        self.background.draw(self.screen)
 
         # Заголовок
         title_text = render_text("НАСТРОЙКИ", size="title", color=BLUE)
@@ -368,6 +432,11 @@ class SettingsMenu:
             )
             pygame.draw.rect(self.screen, GREEN, check_rect)
 
+        # Частота кадров
+        rate_label = render_text("Частота кадров:", size="medium", color=WHITE)
+        self.screen.blit(rate_label, (WIDTH // 2 - 200, 343))
+        self.render_rate_button.draw(self.screen)
+
         # Кнопки
         self.apply_button.draw(self.screen)
         self.back_button.draw(self.screen)
@@ -417,6 +486,11 @@ class SettingsMenu:
             if mouse_click and self.fps_checkbox['rect'].collidepoint(mouse_pos):
                 self.fps_checkbox['checked'] = not self.fps_checkbox['checked']
 
+            # Переключение частоты кадров по кругу
+            self.render_rate_button.check_hover(mouse_pos)
+            if self.render_rate_button.is_clicked(mouse_pos, mouse_click):
+                self.set_render_rate(self.next_render_rate())
+
             # Обработка кнопок
             self.apply_button.check_hover(mouse_pos)
             self.back_button.check_hover(mouse_pos)
@@ -428,28 +502,37 @@ class SettingsMenu:
             if self.back_button.is_clicked(mouse_pos, mouse_click):
                 return False
 
+            self.background.update()
             self.draw()
             self.clock.tick(60)
 
     def save_settings(self):
         """Сохранение настроек в файл"""
-        try:
-            with open("settings.txt", "w") as f:
-                f.write(f"volume={self.volume}\n")
-                f.write(f"show_fps={int(self.fps_checkbox['checked'])}")
-        except:
-            pass
+        self.show_fps = self.fps_checkbox['checked']
+        settings_store.set("volume", self.volume)
+        settings_store.set("show_fps", self.show_fps)
+        settings_store.set("render_rate", self.render_rate)
+        settings_store.save()
+
+    def next_render_rate(self):
+        """Следующая частота кадров из допустимых"""
+        if self.render_rate not in RENDER_RATES:
+            return RENDER_RATES[0]
+        index = RENDER_RATES.index(self.render_rate)
+        return RENDER_RATES[(index + 1) % len(RENDER_RATES)]
+
+    def set_render_rate(self, rate):
+        self.render_rate = rate if rate in RENDER_RATES else FPS
+        self.render_rate_button.text = f"{self.render_rate} Гц"
 
     def load_settings(self):
-        """Загрузка настроек из файла"""
-        try:
-            with open("settings.txt", "r") as f:
-                for line in f:
-                    if line.startswith("volume="):
-                        self.volume = float(line.split("=")[1])
-                        self.volume_slider['handle_pos'] = self.volume * 300
-                    elif line.startswith("show_fps="):
-                        self.show_fps = bool(int(line.split("=")[1]))
-                        self.fps_checkbox['checked'] = self.show_fps
-        except:
-            pass
\ No newline at end of file
+        """Загрузка настроек из хранилища"""
+        settings_store.refresh()
+
+        self.volume = settings_store.volume
+        self.volume_slider['handle_pos'] = self.volume * 300
+
+        self.show_fps = settings_store.show_fps
+        self.fps_checkbox['checked'] = self.show_fps
+
+        self.set_render_rate(settings_store.render_rate)
\ No newline at end of file
@@ -1,106 +1,339 @@
 import pygame
-import random
 import math
+from collections import OrderedDict
+import numpy as np
 from settings import *
+from rng import rng_streams
 
 
-class Particle:
-    """Одна частица"""
+class ParticleSpriteCache:
+    """Кэш готовых картинок частиц по ключу (цвет, размер, прозрачность)
 
-    def __init__(self, x, y, color, velocity_x=0, velocity_y=0,
-                 lifetime=60, size=3, gravity=0.1, fade=True):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.velocity_x = velocity_x
-        self.velocity_y = velocity_y
-        self.lifetime = lifetime
-        self.max_lifetime = lifetime
-        self.size = size
-        self.gravity = gravity
-        self.fade = fade
-        self.alive = True
+    Прозрачность квантуется до ALPHA_LEVELS уровней, поэтому картинок
+    немного, и при отрисовке частиц новые поверхности не создаются.
+    """
 
-    def update(self):
-        self.x += self.velocity_x
-        self.y += self.velocity_y
-        self.velocity_y += self.gravity
-
-        self.lifetime -= 1
-        if self.lifetime <= 0:
-            self.alive = False
-
-    def draw(self, screen):
-        if self.fade:
-            # Плавное исчезновение
-            alpha = int(255 * (self.lifetime / self.max_lifetime))
-            color = (*self.color[:3], alpha) if len(self.color) == 4 else self.color
-            if len(color) == 4:
-                surf = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-                pygame.draw.circle(surf, color, (self.size, self.size), self.size)
-                screen.blit(surf, (self.x - self.size, self.y - self.size))
-            else:
-                pygame.draw.circle(screen, color,
-                                   (int(self.x), int(self.y)), self.size)
-        else:
-            pygame.draw.circle(screen, self.color,
-                               (int(self.x), int(self.y)), self.size)
+    ALPHA_LEVELS = 16
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.sprites = OrderedDict()
+
+        # Статистика
+        self.hits = 0
+        self.misses = 0
+
+    def make_keys(self, colors, sizes, alphas):
+        """Упаковка (r, g, b, размер, прозрачность) в одно число для массива частиц"""
+        step = 255 // (self.ALPHA_LEVELS - 1)
+        alphas = np.asarray(alphas, dtype=np.int64) // step * step
+        return ((colors[:, 0] << 16) | (colors[:, 1] << 8) | colors[:, 2] |
+                (sizes << 24) | (alphas << 32))
+
+    def get(self, key):
+        """Картинка частицы по упакованному ключу (создается при первом обращении)"""
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        color = ((key >> 16) & 0xff, (key >> 8) & 0xff, key & 0xff, (key >> 32) & 0xff)
+        size = (key >> 24) & 0xff
+
+        sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, color, (size, size), size)
+        self.sprites[key] = sprite
+
+        if len(self.sprites) > self.max_size:
+            self.sprites.popitem(last=False)
+
+        return sprite
+
+    def clear(self):
+        """Очистка кэша"""
+        self.sprites.clear()
+
+
+# Глобальный кэш картинок частиц
+particle_sprites = ParticleSpriteCache()
 
 
 class ParticleSystem:
-    """Система частиц"""
+    """Система частиц
+
+    Частицы хранятся не объектами, а набором массивов NumPy
+    (позиции, скорости, время жизни, размеры, цвета) и обновляются
+    все сразу. Мёртвые частицы удаляются перестановкой с конца массива.
+    """
+
+    INITIAL_CAPACITY = 32
+
+    # Массивы частиц: имя -> (тип, форма одного элемента)
+    FIELDS = {
+        "x": (float, ()),
+        "y": (float, ()),
+        "velocity_x": (float, ()),
+        "velocity_y": (float, ()),
+        "gravity": (float, ()),
+        "lifetime": (np.int32, ()),
+        "max_lifetime": (np.int32, ()),
+        "size": (np.int32, ()),
+        "color": (np.uint8, (4,)),
+        "fade": (bool, ()),
+    }
 
     def __init__(self):
-        self.particles = []
+        self.count = 0
+        self.capacity = 0
+        self.allocate(self.INITIAL_CAPACITY)
+
+    def allocate(self, capacity):
+        """Выделение (или расширение) массивов под частицы"""
+        old_count = self.count
+        for name, (dtype, shape) in self.FIELDS.items():
+            array = np.zeros((capacity, *shape), dtype=dtype)
+            if old_count:
+                array[:old_count] = getattr(self, name)[:old_count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def reserve(self, count):
+        """Место под count новых частиц; возвращает срез для них"""
+        needed = self.count + count
+        if needed > self.capacity:
+            capacity = max(self.capacity, 1)
+            while capacity < needed:
+                capacity *= 2
+            self.allocate(capacity)
+        return slice(self.count, needed)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x, y, color, velocity_x, velocity_y, lifetime, size,
+            gravity=0.1, fade=True):
+        """Добавление пачки частиц (скаляры или массивы одной длины)"""
+        velocity_x = np.asarray(velocity_x, dtype=float)
+        count = velocity_x.size
+        if count == 0:
+            return
+
+        batch = self.reserve(count)
+        self.x[batch] = x
+        self.y[batch] = y
+        self.velocity_x[batch] = velocity_x
+        self.velocity_y[batch] = velocity_y
+        self.gravity[batch] = gravity
+        self.lifetime[batch] = lifetime
+        self.max_lifetime[batch] = lifetime
+        self.size[batch] = size
+
+        # Прозрачность применяется только к цветам с альфа-каналом
+        self.color[batch] = (*color[:3], color[3] if len(color) == 4 else 255)
+        self.fade[batch] = fade and len(color) == 4
+
+        self.count = batch.stop
 
     def emit(self, x, y, count=10, color=WHITE,
              min_velocity=(-2, -2), max_velocity=(2, 0),
              lifetime_range=(30, 60), size_range=(2, 5)):
         """Создание вспышки частиц"""
-        for _ in range(count):
-            velocity_x = random.uniform(min_velocity[0], max_velocity[0])
-            velocity_y = random.uniform(min_velocity[1], max_velocity[1])
-            lifetime = random.randint(lifetime_range[0], lifetime_range[1])
-            size = random.randint(size_range[0], size_range[1])
+        rng = rng_streams.numpy("particles")
+        velocity_x = rng.uniform(min_velocity[0], max_velocity[0], count)
+        velocity_y = rng.uniform(min_velocity[1], max_velocity[1], count)
+        lifetime = rng.integers(lifetime_range[0], lifetime_range[1] + 1, count)
+        size = rng.integers(size_range[0], size_range[1] + 1, count)
 
-            particle = Particle(x, y, color, velocity_x, velocity_y,
-                                lifetime, size)
-            self.particles.append(particle)
+        self.add(x, y, color, velocity_x, velocity_y, lifetime, size)
 
     def emit_circle(self, x, y, count=20, color=WHITE,
                     speed=2, lifetime=40):
         """Создание кругового взрыва частиц"""
-        for i in range(count):
-            angle = (i / count) * 2 * math.pi
-            velocity_x = math.cos(angle) * speed
-            velocity_y = math.sin(angle) * speed
+        angle = np.arange(count) / count * 2 * math.pi
+        velocity_x = np.cos(angle) * speed
+        velocity_y = np.sin(angle) * speed
 
-            particle = Particle(x, y, color, velocity_x, velocity_y,
-                                lifetime, size=2)
-            self.particles.append(particle)
+        self.add(x, y, color, velocity_x, velocity_y, lifetime, size=2)
 
     def emit_fountain(self, x, y, count=5, color=WHITE,
                       speed=3, lifetime=50):
         """Создание фонтана частиц (для прыжков)"""
-        for _ in range(count):
-            velocity_x = random.uniform(-1, 1)
-            velocity_y = random.uniform(-speed, -speed * 0.5)
+        rng = rng_streams.numpy("particles")
+        velocity_x = rng.uniform(-1, 1, count)
+        velocity_y = rng.uniform(-speed, -speed * 0.5, count)
+        size = rng.integers(1, 4, count)
 
-            particle = Particle(x, y, color, velocity_x, velocity_y,
-                                lifetime, size=random.randint(1, 3))
-            self.particles.append(particle)
+        self.add(x, y, color, velocity_x, velocity_y, lifetime, size)
 
     def update(self):
         """Обновление всех частиц"""
-        for particle in self.particles[:]:
-            particle.update()
-            if not particle.alive:
-                self.particles.remove(particle)
-
-    def draw(self, screen):
-        """Отрисовка всех частиц"""
-        for particle in self.particles:
-            particle.draw(screen)
+        n = self.count
+        if n == 0:
+            return
+
+        alive = slice(0, n)
+        self.x[alive] += self.velocity_x[alive]
+        self.y[alive] += self.velocity_y[alive]
+        self.velocity_y[alive] += self.gravity[alive]
+        self.lifetime[alive] -= 1
+
+        dead = np.flatnonzero(self.lifetime[alive] <= 0)
+        if dead.size:
+            self.remove(dead)
+
+    def remove(self, indices):
+        """Удаление частиц перестановкой живых частиц с конца массива"""
+        n = self.count
+        new_count = n - indices.size
+
+        # Дыры в начале массива заполняем живыми частицами из хвоста
+        holes = indices[indices < new_count]
+        tail = np.ones(n - new_count, dtype=bool)
+        tail[indices[indices >= new_count] - new_count] = False
+        movers = np.flatnonzero(tail) + new_count
+
+        if holes.size:
+            for name in self.FIELDS:
+                array = getattr(self, name)
+                array[holes] = array[movers]
+
+        self.count = new_count
+
+    def clear(self):
+        """Удаление всех частиц"""
+        self.count = 0
+
+    def bounds(self):
+        """Прямоугольник, охватывающий все частицы (None - частиц нет)"""
+        n = self.count
+        if n == 0:
+            return None
+
+        sizes = self.size[:n]
+        xs = self.x[:n].astype(int)
+        ys = self.y[:n].astype(int)
+        left = int((xs - sizes).min())
+        top = int((ys - sizes).min())
+        right = int((xs + sizes).max())
+        bottom = int((ys + sizes).max())
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def draw(self, screen, offset=(0, 0)):
+        """Отрисовка всех частиц одним пакетом Surface.blits"""
+        n = self.count
+        if n == 0:
+            return
+
+        sizes = self.size[:n].astype(np.int64)
+        colors = self.color[:n].astype(np.int64)
+
+        # Плавное исчезновение только для цветов с альфа-каналом
+        alphas = np.where(self.fade[:n],
+                          255 * self.lifetime[:n] // self.max_lifetime[:n], 255)
+
+        keys = particle_sprites.make_keys(colors, sizes, alphas)
+        xs = self.x[:n].astype(int) - sizes + offset[0]
+        ys = self.y[:n].astype(int) - sizes + offset[1]
+
+        get = particle_sprites.get
+        screen.blits([(get(key), (x, y))
+                      for key, x, y in zip(keys.tolist(), xs.tolist(), ys.tolist())],
+                     doreturn=False)
+
+
+# Приоритеты эффектов: при переполнении сначала выкидываются
+# частицы с меньшим приоритетом (обратная связь важнее украшений)
+EFFECT_PRIORITIES = {
+    "hit": 3,
+    "enemy_death": 2,
+    "collect": 2,
+    "jump": 1,
+    "level_complete": 0,
+    "test": 0,
+}
+EFFECT_NAMES = list(EFFECT_PRIORITIES)
+
+
+class ParticleManager(ParticleSystem):
+    """Единый пул всех живых частиц игры с жестким лимитом
+
+    Эффекты создаются обычными ParticleSystem и передаются в spawn
+    с именем эффекта - частицы копируются в общий пул.
+    """
+
+    FIELDS = {
+        **ParticleSystem.FIELDS,
+        "effect": (np.int8, ()),
+        "priority": (np.int8, ()),
+    }
+
+    def __init__(self, max_particles=MAX_PARTICLES):
+        super().__init__()
+        self.max_particles = max_particles
+
+        # Статистика
+        self.spawned_count = 0
+        self.dropped_count = 0
+
+    def spawn(self, system, effect="test"):
+        """Перенос частиц эффекта в общий пул с учетом лимита"""
+        if system is None or len(system) == 0:
+            return 0
+
+        count = len(system)
+        if effect not in EFFECT_PRIORITIES:
+            effect = "test"
+        effect_id = EFFECT_NAMES.index(effect)
+        priority = EFFECT_PRIORITIES[effect]
+
+        # Освобождаем место за счет частиц с меньшим приоритетом
+        overflow = self.count + count - self.max_particles
+        if overflow > 0:
+            overflow -= self.evict(overflow, priority)
+
+        # Что не поместилось - отбрасываем
+        accepted = count - max(overflow, 0)
+        self.spawned_count += count
+        self.dropped_count += count - accepted
+        if accepted <= 0:
+            return 0
+
+        batch = self.reserve(accepted)
+        for name in ParticleSystem.FIELDS:
+            getattr(self, name)[batch] = getattr(system, name)[:accepted]
+        self.effect[batch] = effect_id
+        self.priority[batch] = priority
+        self.count = batch.stop
+
+        return accepted
+
+    def evict(self, needed, priority):
+        """Удаление до needed частиц с приоритетом ниже priority"""
+        n = self.count
+        candidates = np.flatnonzero(self.priority[:n] < priority)
+        if candidates.size == 0:
+            return 0
+
+        # Сначала самый низкий приоритет, внутри - те, кому меньше осталось жить
+        order = np.lexsort((self.lifetime[candidates], self.priority[candidates]))
+        victims = np.sort(candidates[order[:needed]])
+
+        self.remove(victims)
+        self.dropped_count += victims.size
+        return victims.size
+
+    def stats(self):
+        """Статистика для интерфейса и бенчмарков"""
+        counts = np.bincount(self.effect[:self.count], minlength=len(EFFECT_NAMES))
+        return {
+            "live": self.count,
+            "max": self.max_particles,
+            "spawned": self.spawned_count,
+            "dropped": self.dropped_count,
+            "by_effect": {name: int(counts[i]) for i, name in enumerate(EFFECT_NAMES)},
+        }
 
 
 # Предустановленные эффекты
@@ -52,12 +52,9 @@ class Player(pygame.sprite.Sprite):
         self.update_animation()
         self.animations[self.current_animation].update()
 
-        # Получаем текущий кадр
-        self.image = self.animations[self.current_animation].get_current_image()
-
-        # Отражение при движении влево
-        if not self.facing_right:
-            self.image = pygame.transform.flip(self.image, True, False)
+        # Получаем текущий кадр (при движении влево - готовый отраженный)
+        self.image = self.animations[self.current_animation].get_current_image(
+            flipped=not self.facing_right)
 
     def update_animation(self):
         """Обновление текущей анимации"""
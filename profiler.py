@@ -0,0 +1,163 @@
+"""
+profiler.py - Профилировщик кадра с наложением поверх игры
+
+Кадр размечается вызовами mark(name): время с предыдущей отметки
+прибавляется к разделу name. История хранится в кольцевых буферах,
+на экран выводятся скользящие p50/p99 по разделам и график времени
+кадра. Пока профилировщик выключен, mark() - одна проверка флага.
+"""
+import time
+
+import numpy as np
+import pygame
+
+from settings import *
+from fonts import glyph_atlases
+
+# Сколько кадров истории хранить
+PROFILER_HISTORY = 240
+
+# Как часто пересобирать панель с цифрами (в кадрах)
+PROFILER_REFRESH = 15
+
+PANEL_WIDTH = 300
+GRAPH_HEIGHT = 60
+LINE_HEIGHT = 18
+
+
+class FrameProfiler:
+    """Замеры разделов кадра с кольцевыми буферами истории"""
+
+    def __init__(self, history=PROFILER_HISTORY):
+        self.enabled = False
+        self.history = history
+
+        # Раздел -> кольцевой буфер времени (мс); порядок - как впервые встретились
+        self.sections = {}
+        self.frame_times = np.zeros(history)
+        self.index = 0
+        self.count = 0
+
+        # Текущий кадр
+        self.current = {}
+        self.frame_start = 0.0
+        self.last = 0.0
+
+        # Готовая панель (пересобирается раз в PROFILER_REFRESH кадров)
+        self.panel = None
+        self.panel_age = 0
+
+    def toggle(self):
+        """Включение/выключение; история начинается заново"""
+        self.enabled = not self.enabled
+        self.reset()
+        return self.enabled
+
+    def reset(self):
+        self.sections.clear()
+        self.frame_times[:] = 0
+        self.index = 0
+        self.count = 0
+        self.current = {}
+        self.panel = None
+
+    def begin_frame(self):
+        """Начало кадра"""
+        if not self.enabled:
+            return
+        self.frame_start = self.last = time.perf_counter()
+        self.current = {}
+
+    def mark(self, name):
+        """Время с прошлой отметки записывается в раздел name"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        current = self.current
+        current[name] = current.get(name, 0.0) + (now - self.last) * 1000
+        self.last = now
+
+    def end_frame(self):
+        """Конец кадра: разделы кадра попадают в историю"""
+        if not self.enabled:
+            return
+        index = self.index
+        self.frame_times[index] = (time.perf_counter() - self.frame_start) * 1000
+
+        for name in self.current:
+            if name not in self.sections:
+                self.sections[name] = np.zeros(self.history)
+        for name, buffer in self.sections.items():
+            buffer[index] = self.current.get(name, 0.0)
+
+        self.index = (index + 1) % self.history
+        self.count = min(self.count + 1, self.history)
+        self.panel_age += 1
+
+    def stats(self):
+        """Скользящие p50/p99 (мс) по разделам и для всего кадра"""
+        if self.count == 0:
+            return {}
+
+        count = self.count
+        result = {name: (float(np.percentile(buffer[:count], 50)),
+                         float(np.percentile(buffer[:count], 99)))
+                  for name, buffer in self.sections.items()}
+        result["frame"] = (float(np.percentile(self.frame_times[:count], 50)),
+                           float(np.percentile(self.frame_times[:count], 99)))
+        return result
+
+    def recent_frame_times(self):
+        """История времени кадра от старых к новым"""
+        if self.count < self.history:
+            return self.frame_times[:self.count]
+        return np.roll(self.frame_times, -self.index)
+
+    def build_panel(self):
+        """Панель с таблицей разделов (без графика)"""
+        stats = self.stats()
+        atlas = glyph_atlases.get("small", WHITE)
+
+        rows = [("раздел", "p50", "p99")]
+        rows.extend((name, f"{p50:.2f}", f"{p99:.2f}") for name, (p50, p99) in stats.items())
+
+        height = LINE_HEIGHT * len(rows) + GRAPH_HEIGHT + 20
+        panel = pygame.Surface((PANEL_WIDTH, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+
+        # Шрифт не моноширинный - числа выравниваются по правому краю колонки
+        for i, (name, p50, p99) in enumerate(rows):
+            y = 4 + i * LINE_HEIGHT
+            atlas.blit(panel, name, (8, y))
+            atlas.blit(panel, p50, (PANEL_WIDTH - 80 - atlas.size(p50)[0], y))
+            atlas.blit(panel, p99, (PANEL_WIDTH - 8 - atlas.size(p99)[0], y))
+        return panel
+
+    def draw(self, target, budget_ms=1000 / FPS):
+        """Наложение профилировщика в правом верхнем углу"""
+        if not self.enabled or self.count == 0:
+            return
+
+        if self.panel is None or self.panel_age >= PROFILER_REFRESH:
+            self.panel = self.build_panel()
+            self.panel_age = 0
+
+        panel_rect = self.panel.get_rect(topright=(WIDTH - 10, 10))
+        target.blit(self.panel, panel_rect)
+
+        # График времени кадра с линией бюджета кадра
+        graph = pygame.Rect(panel_rect.left + 8, panel_rect.bottom - GRAPH_HEIGHT - 8,
+                            PANEL_WIDTH - 16, GRAPH_HEIGHT)
+        scale = GRAPH_HEIGHT / (budget_ms * 2)
+        budget_y = graph.bottom - int(budget_ms * scale)
+        pygame.draw.line(target, (255, 215, 0), (graph.left, budget_y), (graph.right, budget_y))
+
+        times = self.recent_frame_times()
+        if len(times) > 1:
+            xs = graph.left + np.arange(len(times)) * graph.width // self.history
+            ys = graph.bottom - np.minimum(times * scale, GRAPH_HEIGHT).astype(int)
+            pygame.draw.lines(target, GREEN, False, list(zip(xs.tolist(), ys.tolist())))
+
+
+# Глобальный экземпляр
+profiler = FrameProfiler()
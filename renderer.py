@@ -0,0 +1,139 @@
+"""
+renderer.py - Отрисовка только изменившихся областей экрана
+"""
+import pygame
+from settings import *
+
+
+def merge_rects(rects, bounds):
+    """Обрезка по экрану и слияние пересекающихся прямоугольников"""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect).clip(bounds)
+        if rect.width <= 0 or rect.height <= 0:
+            continue
+
+        # Поглощаем все пересекающиеся, пока они находятся
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+
+    return merged
+
+
+class RenderTargets:
+    """Постоянные поверхности для отрисовки вместо создания новых каждый кадр
+
+    Все поверхности создаются один раз и переиспользуются; счетчики
+    позволяют проверить, сколько поверхностей создано за кадр.
+    """
+
+    def __init__(self):
+        self.surfaces = {}
+
+        # Статистика
+        self.allocations = 0
+        self.frame_allocations = 0
+
+    def begin_frame(self):
+        """Начало кадра - сброс счетчика созданных поверхностей"""
+        self.frame_allocations = 0
+
+    def count_allocation(self):
+        self.allocations += 1
+        self.frame_allocations += 1
+
+    def get(self, key, size, flags=0, fill=None, alpha=None):
+        """Постоянная поверхность по ключу (заливается один раз при создании)"""
+        surface = self.surfaces.get(key)
+        if surface is None or surface.get_size() != tuple(size):
+            surface = pygame.Surface(size, flags)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha() if flags & pygame.SRCALPHA else surface.convert()
+            if fill is not None:
+                surface.fill(fill)
+            if alpha is not None:
+                surface.set_alpha(alpha)
+            self.surfaces[key] = surface
+            self.count_allocation()
+        return surface
+
+    def cached(self, key, build):
+        """Поверхность, построенная функцией build один раз"""
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = build()
+            self.surfaces[key] = surface
+            self.count_allocation()
+        return surface
+
+    def overlay(self, color, alpha, size=(WIDTH, HEIGHT)):
+        """Заранее залитое полупрозрачное затемнение экрана"""
+        return self.get(("overlay", tuple(color), alpha), size, fill=color, alpha=alpha)
+
+    def clear(self):
+        """Удаление всех поверхностей"""
+        self.surfaces.clear()
+
+
+class DirtyRectRenderer:
+    """Учет грязных прямоугольников между кадрами
+
+    Каждый кадр фон восстанавливается только там, где спрайты были в
+    прошлом кадре и где они находятся сейчас, и на экран выводятся
+    только эти области через pygame.display.update(rects).
+    """
+
+    def __init__(self, size=(WIDTH, HEIGHT)):
+        self.bounds = pygame.Rect((0, 0), size)
+        self.screen_area = size[0] * size[1]
+
+        # Области динамических объектов в прошлом кадре
+        self.previous = []
+        self.needs_full = True
+
+        # Статистика
+        self.frames = 0
+        self.full_frames = 0
+        self.last_saved = 0.0
+        self.total_saved = 0.0
+
+    def invalidate(self):
+        """Следующий кадр будет нарисован целиком"""
+        self.needs_full = True
+
+    def regions(self, current, extra=()):
+        """Области, которые нужно перерисовать в этом кадре"""
+        return merge_rects(list(self.previous) + list(current) + list(extra), self.bounds)
+
+    def record_full(self, current, clean=True):
+        """Учет полностью перерисованного кадра
+
+        clean=False - кадр был нарисован со сдвигом или затемнением,
+        поэтому следующий кадр тоже придется рисовать целиком.
+        """
+        self.previous = [pygame.Rect(rect) for rect in current]
+        self.needs_full = not clean
+        self.frames += 1
+        self.full_frames += 1
+        self.last_saved = 0.0
+
+    def record_dirty(self, current, regions):
+        """Учет кадра, выведенного по областям"""
+        self.previous = [pygame.Rect(rect) for rect in current]
+        self.frames += 1
+
+        dirty_area = sum(rect.width * rect.height for rect in regions)
+        self.last_saved = max(0.0, 1.0 - dirty_area / self.screen_area)
+        self.total_saved += self.last_saved
+
+    def stats(self):
+        """Статистика: сколько площади экрана удалось не перерисовывать"""
+        return {
+            "frames": self.frames,
+            "full_frames": self.full_frames,
+            "last_saved": self.last_saved,
+            "average_saved": self.total_saved / self.frames if self.frames else 0.0,
+        }
@@ -0,0 +1,241 @@
+"""
+replay.py - Запись ввода и быстрый повтор сессии без окна
+
+Запись - это зерно генераторов, номер уровня и маски действий
+(см. controls) для каждого шага симуляции. Хранятся только изменения
+маски: (сколько шагов прошло с прошлого изменения, новая маска),
+числа упакованы как varint. Раз в CHECKPOINT_INTERVAL шагов
+запоминается хеш состояния игры, чтобы найти кадр расхождения.
+
+Пример:
+    python replay.py session.rec
+    python replay.py session.rec --hash-every 60
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Без окна и звуковой карты
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from tracing import tracer
+from settings import SIMULATION_RATE
+
+REPLAY_MAGIC = b"PLRP"
+# Версия 2: маска шага - ввод, который применил Game.step(), хеш - до него
+REPLAY_VERSION = 2
+CHECKPOINT_INTERVAL = 600
+
+
+def write_varint(out, value):
+    """Беззнаковое число по 7 бит в байте"""
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def read_varint(data, pos):
+    """Чтение varint; возвращает (число, новая позиция)"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+class InputLog:
+    """Маски действий по шагам симуляции с дельта-кодированием"""
+
+    def __init__(self, level=1, seed=0):
+        self.level = level
+        self.seed = seed
+
+        # (номер шага, маска) - только шаги, где маска изменилась
+        self.changes = []
+        self.frames = 0
+
+        # Хеши состояния: номер шага -> хеш, и хеш в конце записи
+        self.checkpoints = {}
+        self.final_hash = None
+
+    def append(self, actions):
+        """Маска следующего шага"""
+        last = self.changes[-1][1] if self.changes else 0
+        if actions != last:
+            self.changes.append((self.frames, actions))
+        self.frames += 1
+
+    def masks(self):
+        """Маски всех шагов по порядку"""
+        actions = 0
+        changes = iter(self.changes)
+        change = next(changes, None)
+        for frame in range(self.frames):
+            if change is not None and change[0] == frame:
+                actions = change[1]
+                change = next(changes, None)
+            yield actions
+
+    def encode(self):
+        """Упаковка записи в байты"""
+        header = json.dumps({
+            "level": self.level,
+            "seed": self.seed,
+            "frames": self.frames,
+            "hash": self.final_hash,
+            "checkpoints": {str(frame): value for frame, value in self.checkpoints.items()},
+        }).encode("utf-8")
+
+        out = bytearray(REPLAY_MAGIC)
+        out.append(REPLAY_VERSION)
+        write_varint(out, len(header))
+        out += header
+
+        previous = 0
+        for frame, actions in self.changes:
+            write_varint(out, frame - previous)
+            write_varint(out, actions)
+            previous = frame
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, data):
+        """Распаковка записи из байтов"""
+        if data[:4] != REPLAY_MAGIC or data[4] != REPLAY_VERSION:
+            raise ValueError("Не файл записи или неизвестная версия")
+
+        length, pos = read_varint(data, 5)
+        header = json.loads(data[pos:pos + length].decode("utf-8"))
+        pos += length
+
+        log = cls(level=header["level"], seed=header["seed"])
+        log.frames = header["frames"]
+        log.final_hash = header["hash"]
+        log.checkpoints = {int(frame): value for frame, value in header["checkpoints"].items()}
+
+        frame = 0
+        while pos < len(data):
+            delta, pos = read_varint(data, pos)
+            actions, pos = read_varint(data, pos)
+            frame += delta
+            log.changes.append((frame, actions))
+        return log
+
+    @tracer.traced("replay_save", "io")
+    def save(self, filename):
+        try:
+            with open(filename, "wb") as f:
+                f.write(self.encode())
+            return True
+        except OSError:
+            return False
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, "rb") as f:
+            return cls.decode(f.read())
+
+
+class InputRecorder:
+    """Запись ввода игры по шагам симуляции
+
+    Пишется ровно та маска, которую применил шаг (Game.step), поэтому
+    сколько шагов приходилось на кадр отрисовки, для повтора неважно.
+    Действия интерфейса (controls.UI_ACTIONS) в шаг не попадают.
+    """
+
+    def __init__(self, filename, level, seed):
+        self.filename = filename
+        self.log = InputLog(level=level, seed=seed)
+
+    def record_step(self, game, actions):
+        """Шаг симуляции: хеш перед шагом (раз в CHECKPOINT_INTERVAL) и его ввод"""
+        if self.log.frames % CHECKPOINT_INTERVAL == 0:
+            self.log.checkpoints[self.log.frames] = game.state_hash()
+
+        self.log.append(actions)
+
+    def save(self, game):
+        """Сохранение записи с хешем конечного состояния
+
+        Вызывается сразу после шага симуляции, чтобы ввод последнего
+        кадра тоже попал в запись.
+        """
+        self.log.final_hash = game.state_hash()
+        return self.log.save(self.filename)
+
+
+def replay(log, hash_every=0):
+    """Повтор записи без окна; возвращает (игра, шаг первого расхождения или None, секунды)"""
+    from game import Game
+    game = Game(start_level=log.level, headless=True, seed=log.seed)
+
+    mismatch = None
+    start = time.perf_counter()
+    for frame, actions in enumerate(log.masks()):
+        # Тот же путь, что в игре: ввод копится и применяется в step()
+        game.apply_input(actions)
+
+        # При записи хеш снимается перед шагом, до применения его ввода
+        expected = log.checkpoints.get(frame)
+        if expected is not None or (hash_every and frame % hash_every == 0):
+            state = game.state_hash()
+            if hash_every and frame % hash_every == 0:
+                print(f"{frame}: {state}")
+            if expected is not None and state != expected and mismatch is None:
+                mismatch = frame
+
+        game.step()
+    elapsed = time.perf_counter() - start
+
+    if mismatch is None and log.final_hash is not None and game.state_hash() != log.final_hash:
+        mismatch = log.frames
+    return game, mismatch, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Повтор записанной сессии без окна")
+    parser.add_argument("replay", help="файл записи")
+    parser.add_argument("--hash-every", type=int, default=0,
+                        help="печатать хеш состояния каждые N шагов")
+    args = parser.parse_args(argv)
+
+    try:
+        log = InputLog.load(args.replay)
+    except (OSError, ValueError) as e:
+        print(f"Не удалось загрузить запись: {e}")
+        return 2
+
+    pygame.init()
+    game, mismatch, elapsed = replay(log, args.hash_every)
+    pygame.quit()
+
+    speed = log.frames / elapsed if elapsed > 0 else float("inf")
+    print(f"Уровень {log.level}, зерно {log.seed}: {log.frames} шагов за {elapsed:.2f} с "
+          f"(x{speed / SIMULATION_RATE:.1f} от реального времени)")
+    print(f"Хеш состояния: {game.state_hash()}")
+
+    if mismatch is not None:
+        print(f"РАСХОЖДЕНИЕ: состояние не совпало к шагу {mismatch}")
+        return 1
+
+    print("Состояние совпало с записью")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
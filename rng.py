@@ -0,0 +1,51 @@
+"""
+rng.py - Генераторы случайных чисел по подсистемам
+
+Все генераторы выводятся из одного зерна, но у каждой подсистемы
+свой поток: лишний вызов в эффектах не сдвигает, например, положение
+монет. С одинаковым зерном и вводом игра повторяется кадр в кадр.
+"""
+import random
+import zlib
+
+import numpy as np
+
+
+class RandomStreams:
+    """Именованные потоки random.Random и numpy Generator от одного зерна"""
+
+    def __init__(self, seed=None):
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """Новое зерно (None - случайное); все потоки создаются заново"""
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        self.base_seed = seed
+        self.streams = {}
+        self.numpy_streams = {}
+
+    def stream_seed(self, name):
+        """Зерно потока - из общего зерна и имени подсистемы"""
+        return [self.base_seed & 0xffffffff, zlib.crc32(name.encode("utf-8"))]
+
+    def get(self, name):
+        """Поток random.Random подсистемы"""
+        stream = self.streams.get(name)
+        if stream is None:
+            stream = random.Random(sum(value << (32 * i)
+                                       for i, value in enumerate(self.stream_seed(name))))
+            self.streams[name] = stream
+        return stream
+
+    def numpy(self, name):
+        """Поток numpy.random.Generator подсистемы"""
+        stream = self.numpy_streams.get(name)
+        if stream is None:
+            stream = np.random.default_rng(self.stream_seed(name))
+            self.numpy_streams[name] = stream
+        return stream
+
+
+# Глобальный экземпляр
+rng_streams = RandomStreams()
@@ -15,4 +15,13 @@ SKY_BLUE = (135, 206, 235)
 # Физика
 GRAVITY = 0.8
 JUMP_POWER = -15
-PLAYER_SPEED = 5
\ No newline at end of file
+PLAYER_SPEED = 5
+
+# Частицы
+MAX_PARTICLES = 2000
+
+# Игровой цикл
+SIMULATION_RATE = FPS  # шагов симуляции в секунду (не зависит от отрисовки)
+MAX_CATCHUP_STEPS = 5  # больше шагов за кадр не догоняем - игра замедляется
+RENDER_RATES = (30, 60, 144)  # допустимые частоты отрисовки
+INTERPOLATION_MAX_DISTANCE = TILE_SIZE * 2  # дальше - телепорт, без сглаживания
@@ -0,0 +1,118 @@
+"""
+settings_store.py - Пользовательские настройки в памяти
+
+Файл settings.txt читается один раз при запуске, дальше все
+читают и пишут настройки через этот объект. Внешние изменения
+файла замечаются дешёвой проверкой времени модификации.
+"""
+import os
+
+from tracing import tracer
+
+SETTINGS_FILE = "settings.txt"
+
+# Значения по умолчанию
+DEFAULT_SETTINGS = {
+    "volume": 0.7,
+    "show_fps": False,
+    "dirty_rects": False,
+    "render_rate": 60,
+}
+
+
+class SettingsStore:
+    """Хранилище настроек"""
+
+    def __init__(self, filename=SETTINGS_FILE):
+        self.filename = filename
+        self.values = dict(DEFAULT_SETTINGS)
+        self.mtime = None
+        self.loaded = False
+
+    def load(self):
+        """Загрузка настроек из файла"""
+        self.loaded = True
+        try:
+            mtime = os.stat(self.filename).st_mtime
+            with open(self.filename, "r") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return False
+
+        values = dict(DEFAULT_SETTINGS)
+        for line in lines:
+            if "=" not in line:
+                continue
+            key, raw = line.split("=", 1)
+            key = key.strip()
+            if key in DEFAULT_SETTINGS:
+                try:
+                    values[key] = self.parse(key, raw.strip())
+                except ValueError:
+                    pass
+
+        self.values = values
+        self.mtime = mtime
+        return True
+
+    def parse(self, key, raw):
+        """Разбор значения из файла по типу значения по умолчанию"""
+        default = DEFAULT_SETTINGS[key]
+        if isinstance(default, bool):
+            return bool(int(raw))
+        return type(default)(raw)
+
+    @tracer.traced("settings_save", "io")
+    def save(self):
+        """Сохранение настроек в файл"""
+        try:
+            with open(self.filename, "w") as f:
+                lines = []
+                for key, value in self.values.items():
+                    if isinstance(value, bool):
+                        value = int(value)
+                    lines.append(f"{key}={value}")
+                f.write("\n".join(lines))
+            self.mtime = os.stat(self.filename).st_mtime
+            return True
+        except OSError:
+            return False
+
+    def refresh(self):
+        """Перечитать файл, если его изменили снаружи"""
+        try:
+            mtime = os.stat(self.filename).st_mtime
+        except OSError:
+            return False
+
+        if mtime != self.mtime:
+            return self.load()
+        return False
+
+    def get(self, key):
+        """Получение значения настройки"""
+        if not self.loaded:
+            self.load()
+        return self.values.get(key, DEFAULT_SETTINGS.get(key))
+
+    def set(self, key, value):
+        """Изменение значения (в файл попадет при save)"""
+        if not self.loaded:
+            self.load()
+        self.values[key] = value
+
+    @property
+    def volume(self):
+        return self.get("volume")
+
+    @property
+    def show_fps(self):
+        return self.get("show_fps")
+
+    @property
+    def render_rate(self):
+        return self.get("render_rate")
+
+
+# Глобальный экземпляр
+settings_store = SettingsStore()
@@ -0,0 +1,134 @@
+"""
+spatial.py - Пространственная сетка для быстрого поиска столкновений
+"""
+import pygame
+from settings import *
+
+
+class SpatialHash:
+    """Равномерная сетка с ячейками размером cell_size
+
+    Каждый спрайт записан во все ячейки, которые задевает его rect.
+    При движении спрайта ячейки пересчитываются только если он
+    перешел в другие ячейки, поэтому поддержка сетки дешевая.
+    """
+
+    def __init__(self, cell_size=TILE_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+
+        # Спрайт -> (диапазон ячеек, порядковый номер добавления)
+        self.entries = {}
+        self.next_order = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, sprite):
+        return sprite in self.entries
+
+    def cell_range(self, rect):
+        """Диапазон ячеек (x0, y0, x1, y1), которые задевает rect"""
+        size = self.cell_size
+        return (rect.left // size, rect.top // size,
+                (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def add_to_cells(self, sprite, cell_range):
+        x0, y0, x1, y1 = cell_range
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cells[(cx, cy)] = cell = {}
+                cell[sprite] = None
+
+    def remove_from_cells(self, sprite, cell_range):
+        x0, y0, x1, y1 = cell_range
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell is not None:
+                    cell.pop(sprite, None)
+                    if not cell:
+                        del cells[(cx, cy)]
+
+    def insert(self, sprite):
+        """Добавление спрайта в сетку"""
+        if sprite in self.entries:
+            self.update(sprite)
+            return
+
+        cell_range = self.cell_range(sprite.rect)
+        self.entries[sprite] = (cell_range, self.next_order)
+        self.next_order += 1
+        self.add_to_cells(sprite, cell_range)
+
+    def remove(self, sprite):
+        """Удаление спрайта из сетки"""
+        entry = self.entries.pop(sprite, None)
+        if entry is not None:
+            self.remove_from_cells(sprite, entry[0])
+
+    def update(self, sprite):
+        """Пересчет ячеек после движения спрайта (новый спрайт добавляется)"""
+        entry = self.entries.get(sprite)
+        if entry is None:
+            self.insert(sprite)
+            return
+
+        cell_range = self.cell_range(sprite.rect)
+        if cell_range != entry[0]:
+            self.remove_from_cells(sprite, entry[0])
+            self.add_to_cells(sprite, cell_range)
+            self.entries[sprite] = (cell_range, entry[1])
+
+    def update_all(self, sprites):
+        """Пересчет ячеек для группы движущихся спрайтов"""
+        for sprite in sprites:
+            self.update(sprite)
+
+    def prune(self):
+        """Удаление спрайтов, убранных из всех групп (sprite.kill())"""
+        dead = [sprite for sprite in self.entries if not sprite.alive()]
+        for sprite in dead:
+            self.remove(sprite)
+        return len(dead)
+
+    def clear(self):
+        """Очистка сетки"""
+        self.cells.clear()
+        self.entries.clear()
+
+    def candidates(self, rect):
+        """Спрайты из ячеек, которые задевает rect (без точной проверки)"""
+        x0, y0, x1, y1 = self.cell_range(rect)
+        cells = self.cells
+        found = {}
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    found.update(cell)
+        return found
+
+    def query_rect(self, rect):
+        """Спрайты, пересекающиеся с rect, в порядке добавления в сетку"""
+        rect = pygame.Rect(rect)
+        entries = self.entries
+        hits = [sprite for sprite in self.candidates(rect)
+                if rect.colliderect(sprite.rect)]
+        hits.sort(key=lambda sprite: entries[sprite][1])
+        return hits
+
+    def query_point(self, point):
+        """Спрайты, содержащие точку"""
+        x, y = point
+        cell = self.cells.get((int(x) // self.cell_size, int(y) // self.cell_size))
+        if not cell:
+            return []
+        entries = self.entries
+        hits = [sprite for sprite in cell if sprite.rect.collidepoint(point)]
+        hits.sort(key=lambda sprite: entries[sprite][1])
+        return hits
@@ -0,0 +1,162 @@
+"""
+synth.py - Синтез звука целыми массивами NumPy
+
+Все функции работают с массивами сэмплов float в диапазоне [-1, 1]
+(моно), без циклов по отдельным сэмплам. to_sound() переводит
+результат в формат микшера (частота, разрядность, каналы) из
+pygame.mixer.get_init() и отдает его pygame.mixer.Sound.
+"""
+import numpy as np
+import pygame
+
+# Версия синтеза: увеличить при изменении звучания (ключ кэша audio_cache)
+SYNTH_VERSION = 1
+
+# Формат, если микшер еще не инициализирован (как в main.py)
+DEFAULT_MIXER_FORMAT = (22050, -16, 2)
+
+# Тип сэмпла по размеру из pygame.mixer.get_init()
+SAMPLE_TYPES = {
+    8: np.uint8,
+    -8: np.int8,
+    16: np.uint16,
+    -16: np.int16,
+    32: np.float32,
+    -32: np.float32,
+}
+
+
+def mixer_format():
+    """(частота, размер сэмпла, каналы) текущего микшера"""
+    return pygame.mixer.get_init() or DEFAULT_MIXER_FORMAT
+
+
+def sample_rate():
+    return mixer_format()[0]
+
+
+def sample_count(duration, rate):
+    return int(round(duration * rate))
+
+
+def time_axis(duration, rate):
+    """Время каждого сэмпла в секундах"""
+    return np.arange(sample_count(duration, rate)) / rate
+
+
+# Формы волны от фазы в периодах (1.0 - полный период)
+WAVEFORMS = {
+    "sine": lambda phase: np.sin(2.0 * np.pi * phase),
+    "square": lambda phase: np.where(phase % 1.0 < 0.5, 1.0, -1.0),
+    "saw": lambda phase: 2.0 * (phase % 1.0) - 1.0,
+    "triangle": lambda phase: 1.0 - 4.0 * np.abs((phase % 1.0) - 0.5),
+}
+
+
+def tone(frequency, duration, rate, waveform="sine", amplitude=1.0):
+    """Тон постоянной частоты"""
+    phase = time_axis(duration, rate) * frequency
+    return amplitude * WAVEFORMS[waveform](phase)
+
+
+def sweep(start_frequency, end_frequency, duration, rate, waveform="sine", amplitude=1.0):
+    """Тон с линейно меняющейся частотой"""
+    n = sample_count(duration, rate)
+    frequency = np.linspace(start_frequency, end_frequency, n, endpoint=False)
+    phase = np.cumsum(frequency) / rate
+    return amplitude * WAVEFORMS[waveform](phase)
+
+
+def fade_out(n):
+    """Линейное затухание от 1 до 0"""
+    return 1.0 - np.arange(n) / n if n else np.zeros(0)
+
+
+def adsr(n, rate, attack=0.01, decay=0.05, sustain=0.7, release=0.1):
+    """Огибающая ADSR длиной n сэмплов (release - в конце звука)"""
+    envelope = np.full(n, float(sustain))
+
+    attack_n = min(n, sample_count(attack, rate))
+    decay_n = min(n - attack_n, sample_count(decay, rate))
+    release_n = min(n - attack_n - decay_n, sample_count(release, rate))
+
+    envelope[:attack_n] = np.linspace(0.0, 1.0, attack_n, endpoint=False)
+    envelope[attack_n:attack_n + decay_n] = np.linspace(1.0, sustain, decay_n, endpoint=False)
+    if release_n:
+        envelope[n - release_n:] = np.linspace(sustain, 0.0, release_n)
+    return envelope
+
+
+def noise(duration, rate, rng, amplitude=1.0):
+    """Белый шум в [0, amplitude) - как random.random()"""
+    return amplitude * rng.random(sample_count(duration, rate))
+
+
+def drum(duration, rate, rng, amplitude=1.0, decay=10.0):
+    """Удар: шум с экспоненциальным затуханием"""
+    t = time_axis(duration, rate)
+    return noise(duration, rate, rng, amplitude) * np.exp(-t * decay)
+
+
+def place(buffer, samples, start, rate):
+    """Добавление samples в buffer с момента start (секунды)"""
+    offset = sample_count(start, rate)
+    if offset >= len(buffer):
+        return buffer
+    end = min(len(buffer), offset + len(samples))
+    buffer[offset:end] += samples[:end - offset]
+    return buffer
+
+
+def sequence(events, duration, rate, render):
+    """Дорожка из событий (start, *params): render(*params) дает сэмплы события"""
+    buffer = np.zeros(sample_count(duration, rate))
+    for start, *params in events:
+        place(buffer, render(*params), start, rate)
+    return buffer
+
+
+def notes(melody, duration, rate, waveform="sine", amplitude=1.0, envelope=None):
+    """Дорожка нот (start, frequency, length) с огибающей envelope(n)"""
+    def render(frequency, length):
+        samples = tone(frequency, length, rate, waveform, amplitude)
+        if envelope is not None:
+            samples *= envelope(len(samples))
+        return samples
+
+    return sequence(melody, duration, rate, render)
+
+
+def mix(*tracks):
+    """Сумма дорожек (короткие дополняются тишиной)"""
+    length = max(len(track) for track in tracks)
+    mixed = np.zeros(length)
+    for track in tracks:
+        mixed[:len(track)] += track
+    return mixed
+
+
+def to_pcm(samples, fmt=None):
+    """Сэмплы [-1, 1] -> массив (n, каналы) в формате микшера"""
+    rate, size, channels = fmt or mixer_format()
+    samples = np.clip(samples, -1.0, 1.0)
+
+    sample_type = SAMPLE_TYPES.get(size, np.int16)
+    if abs(size) == 32:
+        pcm = samples.astype(sample_type)
+    else:
+        info = np.iinfo(sample_type)
+        scale = (info.max - info.min) // 2
+        # Для беззнаковых форматов тишина - середина диапазона
+        zero = info.min + scale + 1 if info.min == 0 else 0
+        pcm = (samples * scale).astype(np.int64) + zero
+        pcm = pcm.clip(info.min, info.max).astype(sample_type)
+
+    return np.ascontiguousarray(np.repeat(pcm[:, None], channels, axis=1))
+
+
+def to_sound(samples, volume=1.0, fmt=None):
+    """pygame.mixer.Sound из сэмплов без поэлементной работы в Python"""
+    sound = pygame.mixer.Sound(buffer=to_pcm(samples, fmt))
+    sound.set_volume(volume)
+    return sound
@@ -0,0 +1,75 @@
+"""
+test_replay.py - Запись и повтор сессии при неровном числе шагов за кадр
+
+Запуск: python -m unittest test_replay
+(pytest из корня не подходит - platform.py закрывает модуль стандартной библиотеки)
+"""
+import os
+import random
+import tempfile
+import unittest
+
+# Окно и звук - заглушки SDL (до импорта pygame)
+import headless
+
+import pygame
+
+import controls
+from game import Game
+from replay import InputLog, replay
+
+# Шагов симуляции за кадр отрисовки: 0 - кадр короче шага (144 Гц),
+# 2 - кадр на 30 Гц, 3 и 5 - догон после рывка
+STEPS_PER_FRAME = (0, 1, 1, 2, 0, 3, 1, 5, 2)
+
+
+def record_session(filename, level, seed, frames=900):
+    """Запись сессии со случайным вводом и случайным числом шагов за кадр"""
+    game = Game(start_level=level, headless=True, seed=seed, record=filename)
+    next_actions = headless.random_input(seed)
+    rng = random.Random(seed)
+
+    for frame in range(frames):
+        actions = next_actions(frame, game)
+        if rng.random() < 0.1:
+            actions |= controls.PAUSE
+        if rng.random() < 0.02:
+            actions |= controls.RESTART
+        game.apply_input(actions)
+
+        for _ in range(rng.choice(STEPS_PER_FRAME)):
+            game.step()
+
+    game.stop_recording()
+    return game
+
+
+class ReplayTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def test_uneven_steps_per_frame(self):
+        """Повтор совпадает с записью, сколько бы шагов ни было в кадре"""
+        with tempfile.TemporaryDirectory() as directory:
+            for level in (1, 2, 3):
+                for seed in range(4):
+                    with self.subTest(level=level, seed=seed):
+                        filename = os.path.join(directory, f"level{level}_{seed}.rec")
+                        recorded = record_session(filename, level, seed)
+
+                        log = InputLog.load(filename)
+                        replayed, mismatch, _ = replay(log)
+
+                        self.assertIsNone(mismatch)
+                        self.assertEqual(replayed.state_hash(), recorded.state_hash())
+                        self.assertEqual(replayed.state_hash(), log.final_hash)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+"""
+tracing.py - Запись трассы в формате Chrome trace-event
+
+Включается флагом --trace ФАЙЛ или переменной окружения
+PLATFORMER_TRACE. События begin/end копятся в очереди и пишутся в
+файл фоновым потоком пачками; готовый файл открывается в
+chrome://tracing или ui.perfetto.dev. Пока трасса выключена,
+span() возвращает пустой контекст, а traced() - одну проверку флага.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+TRACE_ENV = "PLATFORMER_TRACE"
+
+# Как часто фоновый поток сбрасывает события в файл (секунды)
+TRACE_FLUSH_INTERVAL = 0.5
+
+
+class NullSpan:
+    """Пустой участок, когда трасса выключена"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    """Участок трассы: begin при входе, end при выходе"""
+
+    __slots__ = ("tracer", "name", "category", "args")
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.tracer.begin(self.name, self.category, self.args)
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.end(self.name, self.category)
+        return False
+
+
+class Tracer:
+    """Сбор событий и фоновая запись в JSON-массив trace-event"""
+
+    def __init__(self):
+        self.enabled = False
+        self.filename = None
+        self.file = None
+        self.events = deque()
+        self.written = 0
+
+        self.start_time = 0.0
+        self.pid = os.getpid()
+
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.write_lock = threading.Lock()
+
+    def start(self, filename, flush_interval=TRACE_FLUSH_INTERVAL):
+        """Начало записи трассы в файл"""
+        if self.enabled:
+            return True
+        try:
+            self.file = open(filename, "w")
+        except OSError as e:
+            print(f"Не удалось открыть файл трассы: {e}")
+            return False
+
+        self.filename = filename
+        self.file.write("[\n")
+        self.written = 0
+        self.start_time = time.perf_counter()
+        self.enabled = True
+        self.name_thread("main")
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.flush_loop, args=(flush_interval,),
+                                       name="trace-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.stop)
+        return True
+
+    def stop(self):
+        """Остановка записи: остаток событий и закрытие файла"""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+        self.flush()
+        with self.write_lock:
+            self.file.write("\n]\n")
+            self.file.close()
+            self.file = None
+
+    def timestamp(self):
+        """Время от начала трассы в микросекундах"""
+        return (time.perf_counter() - self.start_time) * 1e6
+
+    def add(self, event):
+        event["pid"] = self.pid
+        event["tid"] = threading.get_ident()
+        self.events.append(event)
+
+    def begin(self, name, category="game", args=None):
+        if not self.enabled:
+            return
+        event = {"name": name, "cat": category, "ph": "B", "ts": self.timestamp()}
+        if args:
+            event["args"] = args
+        self.add(event)
+
+    def end(self, name, category="game"):
+        if not self.enabled:
+            return
+        self.add({"name": name, "cat": category, "ph": "E", "ts": self.timestamp()})
+
+    def instant(self, name, category="game", args=None):
+        """Мгновенное событие (отметка на шкале)"""
+        if not self.enabled:
+            return
+        event = {"name": name, "cat": category, "ph": "i", "s": "t", "ts": self.timestamp()}
+        if args:
+            event["args"] = args
+        self.add(event)
+
+    def name_thread(self, name):
+        """Имя текущего потока в просмотрщике"""
+        if not self.enabled:
+            return
+        self.add({"name": "thread_name", "ph": "M", "args": {"name": name}})
+
+    def span(self, name, category="game", args=None):
+        """Контекст для участка: with tracer.span("draw"): ..."""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, args)
+
+    def traced(self, name=None, category="game"):
+        """Декоратор: вызов функции записывается участком трассы"""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                self.begin(span_name, category)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.end(span_name, category)
+            return wrapper
+        return decorator
+
+    def flush_loop(self, interval):
+        """Фоновый поток: сброс событий раз в interval секунд"""
+        while not self.stop_event.wait(interval):
+            self.flush()
+
+    def flush(self):
+        """Запись накопившихся событий в файл одной пачкой"""
+        events = self.events
+        lines = []
+        while events:
+            lines.append(json.dumps(events.popleft(), ensure_ascii=False))
+        if not lines:
+            return
+
+        with self.write_lock:
+            if self.file is None:
+                return
+            prefix = ",\n" if self.written else ""
+            self.file.write(prefix + ",\n".join(lines))
+            self.file.flush()
+            self.written += len(lines)
+
+
+# Глобальный экземпляр
+tracer = Tracer()
+
+
+def start_tracing(filename=None):
+    """Включение трассы из аргумента или переменной окружения"""
+    filename = filename or os.environ.get(TRACE_ENV)
+    if filename:
+        return tracer.start(filename)
+    return False